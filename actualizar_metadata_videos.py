@@ -1,111 +1,178 @@
 import os
-import csv
-import pickle
 import time
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import sys
+import argparse
+import math # Para calcular lotes
+import json # Para el diario de la ejecución
+import threading # Para el limitador de tasa y el diario
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from youtube_core import (
+    CredentialsManager,
+    QuotaExceededError,
+    VideoCsv,
+    VideoRecord,
+    enable_quota_ledger,
+    enable_tracing,
+    execute_with_retry,
+    get_credentials,
+    get_quota_ledger,
+    get_thread_http,
+    is_quota_error,
+    quota_cost,
+)
+from youtube_core import auth as core_auth
 
 ### CONFIGURACIÓN ###
 CLIENT_SECRETS_FILE = "client_secret.json" # Tu archivo de credenciales
 # ¡IMPORTANTE! Se necesita scope de escritura para actualizar videos
 SCOPES = ["https://www.googleapis.com/auth/youtube"]
-API_SERVICE_NAME = "youtube"
-API_VERSION = "v3"
 CSV_FILENAME = "videos_a_actualizar.csv" # Nombre del archivo CSV con los datos
 # Usar un nombre de token diferente para el scope de escritura
 TOKEN_PICKLE_FILE = 'token_youtube_write.pickle'
-# Pausa entre actualizaciones (en segundos) para evitar errores de cuota
-DELAY_BETWEEN_UPDATES = 1.5
+# Número de hilos que envían actualizaciones en paralelo
+MAX_WORKERS = 4
+# Límites de tasa compartidos por todos los hilos (sustituyen a la pausa fija entre videos)
+MAX_REQUESTS_PER_SECOND = 2.0
+MAX_QUOTA_UNITS_PER_MINUTE = 3000 # Cada videos().update cuesta 50 unidades
+UPDATE_QUOTA_COST = quota_cost("youtube.videos.update")
+# Modo --batch: actualizaciones agrupadas en cada petición HTTP multipart (máximo de la API: 50)
+UPDATE_BATCH_SIZE = 50
+# La API permite hasta 50 IDs por cada llamada a videos().list
+DETAILS_BATCH_SIZE = 50
+# Del snippet actual solo se usan el título y la descripción (para comparar) y la categoría
+# (obligatoria al actualizar): la API no envía el resto (etiquetas, miniaturas...)
+DETAILS_FIELDS = "items(id,snippet(title,description,categoryId))"
+# Diario append-only con el resultado de cada video (permite continuar con --resume)
+JOURNAL_FILE = 'actualizar_metadata_journal.jsonl'
+# Cada cuántas entradas se fuerza la escritura a disco (fsync) del diario
+JOURNAL_FSYNC_EVERY = 20
+# Traza JSONL con una línea por cada llamada a la API (None para no guardarla)
+TRACE_FILE = 'trace_actualizar.jsonl'
+# Mensajes por cada video (intento y éxito); también con --verbose. Los fallos se muestran siempre
+VERBOSE = False
 # ------------------
 
-def get_authenticated_service():
-    """Autentica al usuario (con permisos de escritura) y devuelve el servicio API."""
-    credentials = None
-    if os.path.exists(TOKEN_PICKLE_FILE):
-        with open(TOKEN_PICKLE_FILE, 'rb') as token:
-            try:
-                credentials = pickle.load(token)
-            except (pickle.UnpicklingError, EOFError):
-                 print(f"Advertencia: No se pudo leer {TOKEN_PICKLE_FILE}. Se solicitará autorización.")
-                 credentials = None
-
-    if not credentials or not credentials.valid:
-        if credentials and credentials.expired and credentials.refresh_token:
-            print("Refrescando token de acceso...")
-            try:
-                credentials.refresh(Request())
-            except Exception as e:
-                print(f"Error al refrescar el token ({type(e).__name__}): {e}. Se requiere nueva autorización.")
-                if os.path.exists(TOKEN_PICKLE_FILE):
-                    try:
-                        os.remove(TOKEN_PICKLE_FILE)
-                        print(f"Archivo de token '{TOKEN_PICKLE_FILE}' eliminado.")
-                    except OSError as oe:
-                        print(f"Error eliminando el archivo de token: {oe}")
-                credentials = None # Fuerza el flujo de abajo
-                flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
-                credentials = flow.run_local_server(port=0)
-        else:
-            if not os.path.exists(CLIENT_SECRETS_FILE):
-                print(f"Error Crítico: No se encuentra el archivo '{CLIENT_SECRETS_FILE}'.")
-                print("Asegúrate de haber descargado el archivo JSON de credenciales y guardado con ese nombre.")
-                sys.exit(1)
+class TokenBucket:
+    """Cubo de fichas seguro entre hilos: se rellena a 'rate' fichas por segundo hasta 'capacity'."""
 
-            print(f"Se necesita autorización para la cuenta de YouTube con permisos de modificación ({SCOPES[0]}).")
-            print("Abriendo navegador...")
-            flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
-            credentials = flow.run_local_server(port=0)
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
 
-        with open(TOKEN_PICKLE_FILE, 'wb') as token:
-            pickle.dump(credentials, token)
-            print(f"Credenciales de escritura guardadas en '{TOKEN_PICKLE_FILE}'.")
+    def acquire(self, tokens=1):
+        """Bloquea hasta poder consumir 'tokens' fichas."""
+        # Una petición más cara que el cubo entero nunca cabría: se limita a la capacidad
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
 
-    try:
-        youtube_service = build(API_SERVICE_NAME, API_VERSION, credentials=credentials)
-        print("Servicio de YouTube (con permisos de escritura) autenticado correctamente.")
-        return youtube_service
-    except HttpError as e:
-        print(f"Error construyendo el servicio API: {e.resp.status} {e.content}")
-        if os.path.exists(TOKEN_PICKLE_FILE):
-            print(f"Intenta eliminar el archivo '{TOKEN_PICKLE_FILE}' y ejecutar de nuevo.")
-        return None
-    except Exception as e:
-        print(f"Error inesperado construyendo el servicio: {e}")
-        return None
+class RateLimiter:
+    """Limita a la vez las peticiones por segundo y las unidades de cuota por minuto."""
+
+    def __init__(self, requests_per_second, quota_units_per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second), clock, sleep)
+        self.quota = TokenBucket(quota_units_per_minute / 60.0, quota_units_per_minute, clock, sleep)
+
+    def acquire(self, quota_cost):
+        self.requests.acquire(1)
+        self.quota.acquire(quota_cost)
+
+# Estados que se anotan en el diario. 'done' y 'unchanged' no se repiten con --resume.
+JOURNAL_DONE = "done"
+JOURNAL_UNCHANGED = "unchanged"
+JOURNAL_FAILED = "failed"
+
+class UpdateJournal:
+    """Diario append-only del resultado de cada video: una línea JSON por video terminado.
+
+    Las entradas se escriben en cuanto se conoce el resultado y se fuerzan a disco (fsync)
+    en grupos de 'fsync_every', y siempre al cerrar. Si un ID aparece varias veces, manda
+    la última entrada.
+    """
+
+    def __init__(self, filename, resume=False, fsync_every=JOURNAL_FSYNC_EVERY):
+        self.filename = filename
+        self.statuses = self._load(filename) if resume else {}
+        self._fsync_every = fsync_every
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        # Sin --resume se empieza un diario nuevo
+        self._file = open(filename, 'a' if resume else 'w', encoding='utf-8')
+
+    @staticmethod
+    def _load(filename):
+        statuses = {}
+        if not os.path.exists(filename):
+            return statuses
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # Última línea a medias si la ejecución se cortó al escribirla
+                statuses[entry['id']] = entry['status']
+        return statuses
+
+    def completed_ids(self):
+        """IDs que no hay que volver a procesar con --resume."""
+        return {video_id for video_id, status in self.statuses.items()
+                if status in (JOURNAL_DONE, JOURNAL_UNCHANGED)}
+
+    def record(self, video_id, status):
+        with self._lock:
+            self.statuses[video_id] = status
+            self._file.write(json.dumps({'id': video_id, 'status': status, 'at': time.time()}) + "\n")
+            self._unsynced += 1
+            if self._unsynced >= self._fsync_every:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+def get_authenticated_service():
+    """Devuelve el servicio API autenticado (con permisos de escritura), compartido en todo el proceso."""
+    return core_auth.get_authenticated_service(TOKEN_PICKLE_FILE, SCOPES, CLIENT_SECRETS_FILE)
 
 def read_video_data_from_csv(filename):
-    """Lee los datos de los videos desde un archivo CSV."""
-    video_data = []
+    """Valida e indexa el CSV con los datos de los videos, sin cargarlo entero en memoria.
+
+    Devuelve el VideoCsv ya recorrido (sus filas se leen después por lotes) o None si el
+    archivo no existe o no tiene las columnas esperadas. Los IDs inválidos y los repetidos
+    se descartan aquí (de cada ID repetido cuenta la última fila).
+    """
     if not os.path.exists(filename):
         print(f"Error Crítico: El archivo CSV '{filename}' no se encuentra en esta carpeta.")
         return None
 
+    expected_columns = ['Título Corregido', 'ID de YouTube', 'Descripción']
     try:
-        with open(filename, mode='r', encoding='utf-8', newline='') as csvfile:
-            # Usar DictReader para acceder a columnas por nombre
-            reader = csv.DictReader(csvfile)
-            # Verificar si las columnas esperadas existen
-            expected_columns = ['Título Corregido', 'ID de YouTube', 'Descripción']
-            if not all(col in reader.fieldnames for col in expected_columns):
-                print(f"Error Crítico: El archivo CSV '{filename}' no tiene las columnas esperadas: {expected_columns}")
-                print(f"Columnas encontradas: {reader.fieldnames}")
-                return None
-
-            for row in reader:
-                # Validar que los campos no estén vacíos (especialmente el ID)
-                if not row.get('ID de YouTube'):
-                    print(f"Advertencia: Fila saltada por no tener 'ID de YouTube': {row}")
-                    continue
-                video_data.append({
-                    'title': row['Título Corregido'],
-                    'id': row['ID de YouTube'],
-                    'description': row['Descripción']
-                })
-        print(f"Se leyeron {len(video_data)} filas de datos del archivo '{filename}'.")
-        return video_data
+        return VideoCsv(filename, 'ID de YouTube', expected_columns).scan()
+    except ValueError as e:
+        print(f"Error Crítico: El archivo CSV '{filename}' no tiene las columnas esperadas: {expected_columns}")
+        print(e)
+        return None
     except FileNotFoundError:
         print(f"Error Crítico: El archivo CSV '{filename}' no se pudo encontrar.")
         return None
@@ -113,65 +180,267 @@ def read_video_data_from_csv(filename):
         print(f"Error inesperado al leer el archivo CSV '{filename}': {e}")
         return None
 
-def get_video_details(youtube, video_id):
-    """Obtiene los detalles actuales de un video, especialmente la categoryId."""
+def video_info_from_row(row):
+    """Convierte una fila del CSV al registro (VideoRecord) que usan el diff y las actualizaciones."""
+    return VideoRecord(row['ID de YouTube'], title=row['Título Corregido'], description=row['Descripción'])
+
+def fetch_details_batch(youtube, batch_ids, batch_label, num_batches):
+    """Obtiene los detalles actuales de hasta 50 videos en una sola llamada: {video_id: VideoRecord}.
+
+    Si el lote falla se devuelve vacío (sus videos quedan sin detalles); la cuota agotada se relanza.
+    """
+    details = {}
+    if VERBOSE:
+        print(f"Procesando lote {batch_label}/{num_batches} ({len(batch_ids)} videos)...")
     try:
-        response = youtube.videos().list(
+        response = execute_with_retry(youtube.videos().list(
             part="snippet", # Necesitamos snippet para obtener categoryId
-            id=video_id
-        ).execute()
-
-        if not response.get("items"):
-            print(f"  -> Error: No se encontró el video con ID '{video_id}'.")
-            return None
+            fields=DETAILS_FIELDS,
+            id=",".join(batch_ids)
+        ))
 
-        # Retorna el snippet completo, que incluye title, description, categoryId, etc.
-        return response["items"][0]["snippet"]
+        for item in response.get("items", []):
+            video = VideoRecord.from_video_item(item)
+            if video.video_id:
+                details[video.video_id] = video
 
+    except QuotaExceededError:
+        print(f"Cuota diaria agotada en el lote {batch_label}/{num_batches} de detalles.")
+        raise
     except HttpError as e:
-        print(f"  -> Error HTTP obteniendo detalles de '{video_id}': {e.resp.status} {e.content}")
-        return None
+        print(f"Error HTTP obteniendo detalles para lote {batch_label}: {e.resp.status} {e.content}")
     except Exception as e:
-        print(f"  -> Error inesperado obteniendo detalles de '{video_id}': {e}")
-        return None
+        print(f"Error inesperado obteniendo detalles para lote {batch_label}: {e}")
+    return details
 
-def update_video_metadata(youtube, video_id, new_title, new_description, current_category_id):
-    """Actualiza el título y la descripción de un video específico."""
-    print(f"  -> Intentando actualizar ID: {video_id}...")
-    try:
-        # El cuerpo de la solicitud necesita el ID y el snippet con los campos a actualizar
-        # ¡IMPORTANTE! 'categoryId' es OBLIGATORIO en el snippet para la actualización
-        update_body = {
-            'id': video_id,
-            'snippet': {
-                'title': new_title,
-                'description': new_description,
-                'categoryId': current_category_id # Usar la categoría existente
-                # Puedes añadir 'tags': ['nuevatag1', 'nuevatag2'] si también quieres actualizar etiquetas
-            }
+def build_update_request(youtube, video_id, new_title, new_description, current_category_id):
+    """Construye (sin enviarla) la petición videos().update de título y descripción."""
+    # El cuerpo de la solicitud necesita el ID y el snippet con los campos a actualizar
+    # ¡IMPORTANTE! 'categoryId' es OBLIGATORIO en el snippet para la actualización
+    update_body = {
+        'id': video_id,
+        'snippet': {
+            'title': new_title,
+            'description': new_description,
+            'categoryId': current_category_id # Usar la categoría existente
+            # Puedes añadir 'tags': ['nuevatag1', 'nuevatag2'] si también quieres actualizar etiquetas
         }
+    }
+    return youtube.videos().update(
+        part="snippet", # Indica que estamos enviando la parte 'snippet' en el body
+        body=update_body
+    )
+
+def update_video_metadata(youtube, video_id, new_title, new_description, current_category_id, http=None):
+    """Actualiza el título y la descripción de un video específico.
 
-        request = youtube.videos().update(
-            part="snippet", # Indica que estamos enviando la parte 'snippet' en el body
-            body=update_body
-        )
-        response = request.execute()
-        print(f"  -> ÉXITO: Video '{response['snippet']['title']}' (ID: {video_id}) actualizado.")
+    Si se indica 'http', la petición se envía por ese transporte (uno por hilo).
+    """
+    if VERBOSE:
+        print(f"  -> Intentando actualizar ID: {video_id}...")
+    try:
+        request = build_update_request(youtube, video_id, new_title, new_description, current_category_id)
+        response = execute_with_retry(request, http=http)
+        if VERBOSE:
+            print(f"  -> ÉXITO: Video '{response['snippet']['title']}' (ID: {video_id}) actualizado.")
         return True
 
+    except QuotaExceededError:
+        print(f"  -> FALLO al actualizar ID: {video_id}. Cuota diaria de la API agotada.")
+        raise # Quien llama detiene la ejecución
     except HttpError as e:
         error_content = e.content.decode('utf-8') if isinstance(e.content, bytes) else str(e.content)
         print(f"  -> FALLO al actualizar ID: {video_id}. Error HTTP: {e.resp.status} {error_content}")
-        if 'quota' in error_content.lower():
-             print("  -> Posible error de cuota excedida. Considera aumentar el DELAY_BETWEEN_UPDATES.")
         return False
     except Exception as e:
         print(f"  -> FALLO al actualizar ID: {video_id}. Error inesperado: {e}")
         return False
 
+def plan_metadata_changes(videos_to_update, video_details):
+    """Compara cada fila del CSV con el video actual y separa las que realmente cambian algo.
+
+    Devuelve (cambios, sin_cambios, sin_detalles): las filas que hay que enviar, las que ya
+    coinciden con YouTube y las que no tienen detalles (video inexistente o lote fallido).
+    """
+    cambios = []
+    sin_cambios = []
+    sin_detalles = []
+    for video_info in videos_to_update:
+        current_video = video_details.get(video_info.video_id)
+        if not current_video:
+            sin_detalles.append(video_info)
+        elif (current_video.title == video_info.title
+              and current_video.description == video_info.description):
+            sin_cambios.append(video_info)
+        else:
+            cambios.append(video_info)
+    return cambios, sin_cambios, sin_detalles
+
+def print_change_plan(cambios, num_sin_cambios, sin_detalles, video_details, show_diff=False):
+    """Muestra el resumen de cambios planificados (y el detalle de cada uno si show_diff)."""
+    print("\n--- Cambios Planificados ---")
+    print(f"  Videos a actualizar: {len(cambios)}")
+    print(f"  Videos sin cambios (se omiten): {num_sin_cambios}")
+    print(f"  Videos sin detalles (se omiten): {len(sin_detalles)}")
+    print(f"  Cuota estimada de las actualizaciones: {len(cambios) * UPDATE_QUOTA_COST} unidades")
+    if not show_diff:
+        return
+    for video_info in cambios:
+        current_video = video_details[video_info.video_id]
+        print(f"\nID={video_info.video_id}")
+        if current_video.title != video_info.title:
+            print(f"  - Título: {current_video.title}")
+            print(f"  + Título: {video_info.title}")
+        if current_video.description != video_info.description:
+            print(f"  - Descripción: {current_video.description[:80]!r}")
+            print(f"  + Descripción: {video_info.description[:80]!r}")
+
+def process_video_update(youtube, credentials, limiter, video_info, current_video, index, total, stop_event):
+    """Actualiza un video del CSV desde un hilo del pool.
+
+    Devuelve True si tuvo éxito, False si falló y None si no se intentó porque la
+    ejecución se detuvo (cuota agotada).
+    """
+    video_id = video_info.video_id
+    new_title = video_info.title
+    new_description = video_info.description
+    if stop_event.is_set():
+        return None
+
+    if VERBOSE:
+        print(f"\nProcesando video {index+1}/{total}: ID={video_id}, Nuevo Título='{new_title[:50]}...'") # Mostrar solo parte del título
+
+    # Si no hay detalles, el video no existe o falló su lote
+    if not current_video:
+        print(f"  -> No se pudieron obtener detalles para el video {video_id}. Saltando actualización.")
+        return False
+
+    current_category_id = current_video.category_id
+    if not current_category_id:
+        print(f"  -> Error: No se pudo obtener la categoryId para el video {video_id}. Saltando actualización.")
+        return False
+
+    # Esperar turno en el limitador compartido antes de gastar cuota
+    limiter.acquire(UPDATE_QUOTA_COST)
+    if stop_event.is_set():
+        return None
+    try:
+        return update_video_metadata(youtube, video_id, new_title, new_description, current_category_id,
+                                     http=get_thread_http(credentials))
+    except QuotaExceededError:
+        # Avisar al resto de hilos para que no envíen más actualizaciones
+        stop_event.set()
+        return None
+
+def update_videos_in_batches(youtube, cambios, video_details, limiter, journal, batch_size=UPDATE_BATCH_SIZE):
+    """Envía las actualizaciones agrupadas en peticiones HTTP multipart (BatchHttpRequest).
+
+    Cada sub-respuesta se asocia a su fila mediante el request_id (posición en 'cambios').
+    Las sub-peticiones que fallan se reintentan una a una con update_video_metadata.
+    Si se agota la cuota, deja de enviar y cuenta como pendientes las filas no enviadas.
+    Devuelve (exitosas, fallidas, pendientes).
+    """
+    success_count = 0
+    failed_rows = []
+    num_batches = math.ceil(len(cambios) / batch_size)
+    quota_exhausted = False
+    sent_count = 0
+
+    for b in range(num_batches):
+        start_index = b * batch_size
+        chunk = cambios[start_index:start_index + batch_size]
+        results = {}
+
+        def callback(request_id, response, exception):
+            results[request_id] = exception
+
+        batch = youtube.new_batch_http_request(callback=callback)
+        for offset, video_info in enumerate(chunk):
+            category_id = video_details[video_info.video_id].category_id
+            batch.add(
+                build_update_request(youtube, video_info.video_id, video_info.title,
+                                     video_info.description, category_id),
+                request_id=str(start_index + offset)
+            )
+
+        print(f"\nEnviando lote {b+1}/{num_batches} ({len(chunk)} actualizaciones en una petición)...")
+        # La cuota se cobra por sub-petición, aunque viajen en una sola petición HTTP
+        # (execute_with_retry la anota en el contador según la respuesta de cada una)
+        limiter.acquire(UPDATE_QUOTA_COST * len(chunk))
+        try:
+            execute_with_retry(batch)
+        except QuotaExceededError:
+            quota_exhausted = True
+        except HttpError as e:
+            print(f"  -> FALLO del lote completo {b+1}: {e.resp.status} {e.content}")
+        except Exception as e:
+            print(f"  -> FALLO inesperado del lote {b+1}: {e}")
+        sent_count += len(chunk)
+
+        batch_ok = 0
+        for offset, video_info in enumerate(chunk):
+            request_id = str(start_index + offset)
+            exception = results.get(request_id)
+            if request_id in results and exception is None:
+                batch_ok += 1
+                journal.record(video_info.video_id, JOURNAL_DONE)
+                continue
+            if is_quota_error(exception):
+                quota_exhausted = True
+            # Sin entrada en 'results' (el lote entero falló) o con excepción: se reintenta luego
+            failed_rows.append(video_info)
+        success_count += batch_ok
+        print(f"  -> Lote {b+1}: {batch_ok} de {len(chunk)} actualizados.")
+        if quota_exhausted:
+            print(f"  -> Cuota diaria agotada en el lote {b+1}/{num_batches}. No se envían más lotes.")
+            break
+
+    pending_count = len(cambios) - sent_count
+    if quota_exhausted:
+        # Sin cuota los reintentos fallarían igual: quedan pendientes para otra ejecución
+        return success_count, 0, pending_count + len(failed_rows)
+
+    if failed_rows:
+        print(f"\nReintentando una a una {len(failed_rows)} actualizaciones fallidas del modo por lotes...")
+    fail_count = 0
+    for i, video_info in enumerate(failed_rows):
+        category_id = video_details[video_info.video_id].category_id
+        limiter.acquire(UPDATE_QUOTA_COST)
+        try:
+            if update_video_metadata(youtube, video_info.video_id, video_info.title,
+                                     video_info.description, category_id):
+                success_count += 1
+                journal.record(video_info.video_id, JOURNAL_DONE)
+            else:
+                fail_count += 1
+                journal.record(video_info.video_id, JOURNAL_FAILED)
+        except QuotaExceededError:
+            return success_count, fail_count, len(failed_rows) - i
+    return success_count, fail_count, pending_count
+
+def parse_args():
+    """Lee las opciones de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Actualiza título y descripción de videos desde un CSV.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Muestra los cambios que se harían sin enviar ninguna actualización.")
+    parser.add_argument("--batch", action="store_true",
+                        help=f"Agrupa hasta {UPDATE_BATCH_SIZE} actualizaciones en cada petición HTTP multipart.")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Continúa una ejecución anterior: omite los videos ya terminados en '{JOURNAL_FILE}' "
+                             "y reintenta solo los fallidos o pendientes.")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Muestra un mensaje por cada video (por defecto solo fallos y resúmenes).")
+    return parser.parse_args()
+
 def main():
     """Función principal del script."""
+    global VERBOSE
+    args = parse_args()
+    VERBOSE = VERBOSE or args.verbose
     print("--- Iniciando Script de Actualización de Metadatos de Videos ---")
+    # Contabilizar la cuota de todas las llamadas en el contador diario compartido
+    enable_quota_ledger()
+    trace = enable_tracing(TRACE_FILE)
 
     # 1. Autenticar con permisos de escritura
     youtube = get_authenticated_service()
@@ -179,58 +448,161 @@ def main():
         print("\nNo se pudo inicializar el servicio de YouTube. Saliendo.")
         sys.exit(1)
 
-    # 2. Leer datos del CSV
-    videos_to_update = read_video_data_from_csv(CSV_FILENAME)
-    if videos_to_update is None:
+    # 2. Validar e indexar el CSV (IDs inválidos y repetidos se informan antes de gastar cuota)
+    video_csv = read_video_data_from_csv(CSV_FILENAME)
+    if video_csv is None:
         print("\nNo se pudieron leer los datos del CSV. Saliendo.")
         sys.exit(1)
-    if not videos_to_update:
+    video_csv.report()
+    if not len(video_csv):
         print("\nEl archivo CSV está vacío o no contiene datos válidos. Saliendo.")
         sys.exit(1)
 
-    # 3. Procesar cada video del CSV
-    print("\n--- Comenzando Actualizaciones ---")
-    success_count = 0
-    fail_count = 0
+    # 2b. Con --resume, omitir los videos ya terminados en una ejecución anterior
+    # En --dry-run el diario se abre para añadir, así que no se trunca (y no se escribe nada)
+    journal = UpdateJournal(JOURNAL_FILE, resume=args.resume or args.dry_run)
+    if args.resume:
+        already_done = video_csv.exclude(journal.completed_ids())
+        print(f"Modo --resume: {already_done} videos ya terminados según "
+              f"'{JOURNAL_FILE}'. Quedan {len(video_csv)}.")
+        if not len(video_csv):
+            print("\nNo queda nada pendiente. Saliendo.")
+            journal.close()
+            return
+
+    # Renovar el token en segundo plano antes de que caduque: una ejecución larga supera su hora de vida
+    credentials_manager = CredentialsManager(get_credentials(TOKEN_PICKLE_FILE, SCOPES), TOKEN_PICKLE_FILE)
+    try:
+        with credentials_manager:
+            run_updates(youtube, args, video_csv, journal)
+    finally:
+        journal.close()
+        trace.report()
+
+def run_updates(youtube, args, video_csv, journal):
+    """Pasos 3 a 6: detalles, diff, actualizaciones y resumen (anotando cada resultado en el diario)."""
+    # 3. Estimar el coste de la ejecución
+    ledger = get_quota_ledger()
+    total = len(video_csv)
+    num_batches = math.ceil(total / DETAILS_BATCH_SIZE)
+    details_cost = num_batches * quota_cost("youtube.videos.list")
+    ledger.report(details_cost + total * UPDATE_QUOTA_COST)
+    if ledger.remaining() < details_cost:
+        print("\nNo queda cuota hoy ni para leer los detalles actuales de los videos. Saliendo.")
+        sys.exit(1)
 
-    for i, video_info in enumerate(videos_to_update):
-        video_id = video_info['id']
-        new_title = video_info['title']
-        new_description = video_info['description']
+    # 4. Leer el CSV por lotes de 50: detalles actuales del lote (una llamada, con categoryId)
+    #    y diff. Solo se guardan las filas cuyo título o descripción cambian, no el CSV entero.
+    print(f"\nObteniendo detalles actuales de {total} videos en {num_batches} lotes...")
+    cambios = []
+    sin_detalles = []
+    video_details = {} # Título, descripción y categoría actuales, solo de los videos que cambian
+    num_sin_cambios = 0
+    try:
+        for i, rows in enumerate(video_csv.iter_batches(DETAILS_BATCH_SIZE)):
+            batch = [video_info_from_row(row) for row in rows]
+            details = fetch_details_batch(youtube, [video_info.video_id for video_info in batch], i + 1, num_batches)
+            batch_cambios, batch_sin_cambios, batch_sin_detalles = plan_metadata_changes(batch, details)
+            cambios.extend(batch_cambios)
+            sin_detalles.extend(batch_sin_detalles)
+            num_sin_cambios += len(batch_sin_cambios)
+            video_details.update((video_info.video_id, details[video_info.video_id]) for video_info in batch_cambios)
+            if not args.dry_run:
+                for video_info in batch_sin_cambios:
+                    journal.record(video_info.video_id, JOURNAL_UNCHANGED)
+    except QuotaExceededError:
+        print("\nCuota diaria de la API agotada antes de empezar las actualizaciones. Saliendo.")
+        sys.exit(1)
+    print(f"Detalles obtenidos para {total - len(sin_detalles)} de {total} videos.")
 
-        print(f"\nProcesando video {i+1}/{len(videos_to_update)}: ID={video_id}, Nuevo Título='{new_title[:50]}...'") # Mostrar solo parte del título
+    for video_info in sin_detalles:
+        print(f"  -> No se pudieron obtener detalles para el video {video_info.video_id}. Saltando actualización.")
+    print_change_plan(cambios, num_sin_cambios, sin_detalles, video_details, show_diff=args.dry_run)
+    if args.dry_run:
+        print("\nModo --dry-run: no se ha enviado ninguna actualización.")
+        return
+    for video_info in sin_detalles:
+        journal.record(video_info.video_id, JOURNAL_FAILED)
 
-        # 3a. Obtener detalles actuales (necesitamos categoryId)
-        print("  -> Obteniendo detalles actuales (categoryId)...")
-        current_snippet = get_video_details(youtube, video_id)
+    # 4b. Si las actualizaciones no caben en la cuota que queda hoy, enviar solo las que caben
+    affordable = ledger.affordable(UPDATE_QUOTA_COST, len(cambios))
+    deferred = cambios[affordable:]
+    if deferred:
+        print(f"\nLa cuota restante ({ledger.remaining()} unidades) solo alcanza para {affordable} de "
+              f"{len(cambios)} actualizaciones. Las otras {len(deferred)} quedan para otro día (--resume).")
+        cambios = cambios[:affordable]
 
-        if current_snippet:
-            current_category_id = current_snippet.get('categoryId')
-            if not current_category_id:
-                print(f"  -> Error: No se pudo obtener la categoryId para el video {video_id}. Saltando actualización.")
-                fail_count += 1
-                continue # Pasar al siguiente video
+    success_count = 0
+    fail_count = len(sin_detalles)
+    pending_count = len(deferred) # No enviadas por falta de cuota
+    limiter = RateLimiter(MAX_REQUESTS_PER_SECOND, MAX_QUOTA_UNITS_PER_MINUTE)
 
-            # 3b. Realizar la actualización
-            if update_video_metadata(youtube, video_id, new_title, new_description, current_category_id):
-                success_count += 1
-            else:
-                fail_count += 1
-        else:
-            # Si no se obtuvieron detalles, el video no existe o hubo error
-            print(f"  -> No se pudieron obtener detalles para el video {video_id}. Saltando actualización.")
-            fail_count += 1
+    if args.batch:
+        # 5. Enviar los videos con cambios en peticiones multipart
+        print(f"\n--- Comenzando Actualizaciones (lotes de {UPDATE_BATCH_SIZE}) ---")
+        batch_success, batch_fail, batch_pending = update_videos_in_batches(youtube, cambios, video_details,
+                                                                            limiter, journal)
+        success_count += batch_success
+        fail_count += batch_fail
+        pending_count += batch_pending
+    else:
+        # 5. Procesar los videos con cambios en paralelo, respetando el limitador de tasa
+        print(f"\n--- Comenzando Actualizaciones ({MAX_WORKERS} hilos) ---")
+        # Credenciales del servicio autenticado, para crear un transporte HTTP por hilo
+        credentials = get_credentials(TOKEN_PICKLE_FILE, SCOPES)
+        stop_event = threading.Event() # Se activa cuando se agota la cuota
 
-        # 3c. Pausa para no exceder la cuota
-        print(f"  -> Esperando {DELAY_BETWEEN_UPDATES} segundos...")
-        time.sleep(DELAY_BETWEEN_UPDATES)
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(process_video_update, youtube, credentials, limiter,
+                                video_info, video_details.get(video_info.video_id), i, len(cambios),
+                                stop_event): video_info.video_id
+                for i, video_info in enumerate(cambios)
+            }
+            handled = set() # Futuros ya contados y anotados en el diario
+            try:
+                for future in as_completed(futures):
+                    handled.add(future)
+                    result = future.result()
+                    if result is None:
+                        pending_count += 1
+                    elif result:
+                        success_count += 1
+                        journal.record(futures[future], JOURNAL_DONE)
+                    else:
+                        fail_count += 1
+                        journal.record(futures[future], JOURNAL_FAILED)
+            except KeyboardInterrupt:
+                # Los hilos terminan la petición en curso; el resto queda pendiente para --resume
+                print("\nInterrumpido por el usuario. Esperando a las peticiones en curso...")
+                stop_event.set()
+                for future in futures:
+                    future.cancel() # Los que aún no empezaron ya no se ejecutan
+                wait(futures)
+                # Anotar lo que terminó mientras tanto, para que --resume no lo repita
+                for future in futures:
+                    if future in handled or future.cancelled():
+                        continue
+                    if future.exception() is not None:
+                        journal.record(futures[future], JOURNAL_FAILED)
+                    elif future.result() is True:
+                        journal.record(futures[future], JOURNAL_DONE)
+                    elif future.result() is False:
+                        journal.record(futures[future], JOURNAL_FAILED)
+                raise
 
-    # 4. Resumen Final
+    # 6. Resumen Final
     print("\n--- Proceso de Actualización Finalizado ---")
     print(f"Resumen:")
-    print(f"  Videos procesados: {len(videos_to_update)}")
+    print(f"  Videos procesados: {total}")
+    print(f"  Videos sin cambios (omitidos): {num_sin_cambios}")
     print(f"  Actualizaciones exitosas: {success_count}")
     print(f"  Actualizaciones fallidas: {fail_count}")
+    if pending_count:
+        print(f"  Pendientes (sin cuota diaria, no enviadas): {pending_count}")
+    if pending_count or fail_count:
+        print(f"  Ejecuta de nuevo con --resume para continuar (diario: '{JOURNAL_FILE}').")
+    ledger.report()
     print("-------------------------------------------")
 
 if __name__ == "__main__":
@@ -0,0 +1,467 @@
+"""Servidor local que imita la parte de la YouTube Data API v3 que usan los scripts.
+
+Implementa channels.list, playlistItems.list (con paginación), videos.list, videos.update y
+las peticiones por lotes (multipart/mixed), sobre canales sintéticos de cualquier tamaño.
+Como la API real, las lecturas aceptan el parámetro 'fields' (respuesta parcial), llevan ETag
+y responden 304 a un If-None-Match que coincide.
+Se puede añadir latencia, errores transitorios (503 / rateLimitExceeded) y un límite de
+cuota (quotaExceeded) para ver cómo se comportan los reintentos y la planificación.
+
+Los scripts lo usan si se define YOUTUBE_API_ENDPOINT (ver youtube_core/auth.py):
+
+    python benchmarks/fake_youtube_api.py --videos 10000 --latency-ms 30 --port 8765
+    YOUTUBE_API_ENDPOINT=http://127.0.0.1:8765/ python generar_csv_videos.py
+
+GET /_stats devuelve las peticiones y la cuota contadas; POST /_reset las pone a cero.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.parser import FeedParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Coste en unidades de cada método (el mismo que cobra la API real)
+QUOTA_COSTS = {
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+    "videos.update": 50,
+}
+DEFAULT_PAGE_SIZE = 5 # maxResults por defecto de playlistItems.list
+MAX_PAGE_SIZE = 50
+MAX_IDS_PER_CALL = 50
+DESCRIPTION_FILLER = "Suscríbete al canal y activa la campanita para no perderte ningún video. " * 8
+
+
+class FakeChannel:
+    """Canal sintético con 'video_count' videos repartidos a lo largo de 'year' (del más nuevo al más antiguo)."""
+
+    def __init__(self, index, video_count, year=2025):
+        self.channel_id = f"UCbench{index:017d}"
+        self.uploads_playlist_id = "UU" + self.channel_id[2:]
+        self.video_ids = [f"c{index:02d}v{i:07d}" for i in range(video_count)]
+        end = datetime(year, 12, 31, 23, 0, tzinfo=timezone.utc)
+        step = timedelta(days=364) / max(video_count, 1)
+        self.published_at = [
+            (end - step * i).strftime("%Y-%m-%dT%H:%M:%SZ") for i in range(video_count)
+        ]
+
+    def __len__(self):
+        return len(self.video_ids)
+
+
+class FakeYouTubeApi:
+    """Estado del servidor falso: canales, videos modificados, contadores e inyección de fallos."""
+
+    def __init__(self, channel_sizes=(1000,), year=2025, latency_ms=0.0, latency_jitter_ms=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, quota_limit=None, seed=0):
+        self.channels = [FakeChannel(i, size, year) for i, size in enumerate(channel_sizes)]
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.quota_limit = quota_limit
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._playlists = {channel.uploads_playlist_id: channel for channel in self.channels}
+        self._videos = {}
+        for channel in self.channels:
+            for position, video_id in enumerate(channel.video_ids):
+                self._videos[video_id] = (channel, position)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.http_requests = 0
+            self.not_modified = 0
+            self.bytes_sent = 0
+            self.quota_units = 0
+            self.injected_errors = 0
+            self.updated_snippets = {}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'http_requests': self.http_requests,
+                'not_modified': self.not_modified,
+                'bytes_sent': self.bytes_sent,
+                'requests': dict(self.requests),
+                'quota_units': self.quota_units,
+                'injected_errors': self.injected_errors,
+                'updated_videos': len(self.updated_snippets),
+            }
+
+    # --- Datos sintéticos ---
+
+    def snippet(self, video_id):
+        channel, position = self._videos[video_id]
+        snippet = {
+            'publishedAt': channel.published_at[position],
+            'channelId': channel.channel_id,
+            'title': f"Video sintético {position}",
+            # Las descripciones reales suelen ocupar la mayor parte de la respuesta
+            'description': f"Descripción del video sintético {position}. " + DESCRIPTION_FILLER,
+            'thumbnails': thumbnails(video_id),
+            'tags': [f"tag{position % 7}", f"serie{position % 13}"],
+            'categoryId': "22",
+        }
+        snippet.update(self.updated_snippets.get(video_id, {}))
+        return snippet
+
+    def video_resource(self, video_id, parts):
+        _, position = self._videos[video_id]
+        resource = {'kind': "youtube#video", 'id': video_id}
+        if 'snippet' in parts:
+            resource['snippet'] = self.snippet(video_id)
+        if 'statistics' in parts:
+            resource['statistics'] = {
+                'viewCount': str((position * 7919) % 1000003),
+                'likeCount': str((position * 104729) % 50021),
+                'commentCount': str(position % 311),
+            }
+        if 'contentDetails' in parts:
+            resource['contentDetails'] = {'duration': f"PT{position % 59 + 1}M{position % 60}S"}
+        if 'status' in parts:
+            resource['status'] = {'privacyStatus': "public" if position % 10 else "private"}
+        return resource
+
+    # --- Peticiones ---
+
+    def _delay(self):
+        delay = self.latency_ms + self._random.uniform(0, self.latency_jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _charge(self, method):
+        """Cuenta la petición y cobra su cuota. Devuelve un error (status, body) si hay que fallar."""
+        with self._lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+            roll = self._random.random()
+            if roll < self.error_rate:
+                self.injected_errors += 1
+                return error_response(503, "backendError", "Error transitorio inyectado.")
+            if roll < self.error_rate + self.rate_limit_rate:
+                self.injected_errors += 1
+                return error_response(403, "rateLimitExceeded", "Límite de tasa inyectado.")
+            cost = QUOTA_COSTS.get(method, 1)
+            if self.quota_limit is not None and self.quota_units + cost > self.quota_limit:
+                return error_response(403, "quotaExceeded", "Cuota diaria agotada (límite del servidor falso).")
+            self.quota_units += cost
+        return None
+
+    def handle(self, http_method, path, query, body):
+        """Atiende una llamada de la API (no la petición por lotes). Devuelve (status, diccionario)."""
+        resource = path.rstrip("/").rsplit("/", 1)[-1]
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        if http_method == "GET" and resource in ("channels", "playlistItems", "videos"):
+            method = f"{resource}.list"
+        elif http_method == "PUT" and resource == "videos":
+            method = "videos.update"
+        else:
+            return error_response(404, "notFound", f"Método no implementado: {http_method} {path}")
+
+        failure = self._charge(method)
+        if failure:
+            return failure
+        if method == "channels.list":
+            status, payload = 200, self.list_channels(params)
+        elif method == "playlistItems.list":
+            status, payload = self.list_playlist_items(params)
+        elif method == "videos.list":
+            status, payload = self.list_videos(params)
+        else:
+            status, payload = self.update_video(params, body)
+        if status == 200 and params.get('fields'):
+            try:
+                payload = apply_fields(payload, parse_fields(params['fields']))
+            except ValueError as e:
+                return error_response(400, "invalidParameter", f"Parámetro 'fields' inválido: {e}")
+        return status, payload
+
+    def list_channels(self, params):
+        if params.get('mine') == "true":
+            channels = self.channels[:1]
+        else:
+            wanted = set(params.get('id', "").split(","))
+            channels = [channel for channel in self.channels if channel.channel_id in wanted]
+        return {
+            'kind': "youtube#channelListResponse",
+            'items': [
+                {'id': channel.channel_id,
+                 'contentDetails': {'relatedPlaylists': {'uploads': channel.uploads_playlist_id}}}
+                for channel in channels
+            ],
+        }
+
+    def list_playlist_items(self, params):
+        channel = self._playlists.get(params.get('playlistId'))
+        if channel is None:
+            return error_response(404, "playlistNotFound", "La playlist no existe.")
+        page_size = min(int(params.get('maxResults', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        start = int(params.get('pageToken') or 0)
+        end = min(start + page_size, len(channel))
+        items = []
+        for video_id in channel.video_ids[start:end]:
+            snippet = self.snippet(video_id)
+            items.append({
+                'kind': "youtube#playlistItem",
+                'id': f"PLI{video_id}",
+                'snippet': {
+                    'publishedAt': snippet['publishedAt'],
+                    'channelId': snippet['channelId'],
+                    'title': snippet['title'],
+                    'description': snippet['description'],
+                    'thumbnails': snippet['thumbnails'],
+                    'playlistId': channel.uploads_playlist_id,
+                    'resourceId': {'kind': "youtube#video", 'videoId': video_id},
+                },
+                'contentDetails': {'videoId': video_id, 'videoPublishedAt': snippet['publishedAt']},
+            })
+        response = {
+            'kind': "youtube#playlistItemListResponse",
+            'items': items,
+            'pageInfo': {'totalResults': len(channel), 'resultsPerPage': page_size},
+        }
+        if end < len(channel):
+            response['nextPageToken'] = str(end)
+        return 200, response
+
+    def list_videos(self, params):
+        ids = [video_id for video_id in params.get('id', "").split(",") if video_id]
+        if len(ids) > MAX_IDS_PER_CALL:
+            return error_response(400, "invalidParameter", f"Como máximo {MAX_IDS_PER_CALL} IDs por llamada.")
+        parts = set(params.get('part', "").split(","))
+        with self._lock:
+            items = [self.video_resource(video_id, parts) for video_id in ids if video_id in self._videos]
+        return 200, {'kind': "youtube#videoListResponse", 'items': items}
+
+    def update_video(self, params, body):
+        try:
+            resource = json.loads(body or b"{}")
+        except ValueError:
+            return error_response(400, "parseError", "El cuerpo no es JSON válido.")
+        video_id = resource.get('id')
+        snippet = resource.get('snippet', {})
+        if video_id not in self._videos:
+            return error_response(404, "videoNotFound", "El video no existe.")
+        if not snippet.get('title') or not snippet.get('categoryId'):
+            return error_response(400, "invalidVideoMetadata", "El snippet necesita title y categoryId.")
+        with self._lock:
+            self.updated_snippets[video_id] = {
+                key: snippet[key] for key in ('title', 'description', 'categoryId', 'tags') if key in snippet
+            }
+            return 200, self.video_resource(video_id, {'snippet'})
+
+    def handle_batch(self, content_type, body):
+        """Atiende una petición multipart/mixed: cada parte es una llamada HTTP completa."""
+        parser = FeedParser()
+        parser.feed(f"Content-Type: {content_type}\r\n\r\n")
+        parser.feed(body.decode('utf-8'))
+        message = parser.close()
+        boundary = f"batch_{self._random.getrandbits(64):016x}"
+        parts = []
+        for part in message.get_payload():
+            content_id = part.get("Content-ID", "").strip("<>")
+            raw_request = part.get_payload()
+            head, _, inner_body = raw_request.partition("\r\n\r\n") if "\r\n\r\n" in raw_request \
+                else raw_request.partition("\n\n")
+            request_line = head.splitlines()[0]
+            http_method, target, _ = request_line.split(" ", 2)
+            url = urlsplit(target)
+            status, payload = self.handle(http_method, url.path, url.query, inner_body.encode('utf-8'))
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(parts).encode('utf-8')
+
+
+def thumbnails(video_id):
+    return {
+        size: {'url': f"https://i.ytimg.com/vi/{video_id}/{size}.jpg", 'width': width, 'height': height}
+        for size, width, height in (("default", 120, 90), ("medium", 320, 180), ("high", 480, 360))
+    }
+
+
+def parse_fields(mask):
+    """Convierte una máscara 'fields' ('items(id,snippet/title),nextPageToken') en un árbol de dicts.
+
+    Cada clave es un campo; su valor es el árbol de subcampos, o None si se pide entero.
+    """
+    tree, end = _parse_field_list(mask, 0)
+    if end != len(mask):
+        raise ValueError(f"carácter inesperado en la posición {end}")
+    return tree
+
+
+def _parse_field_list(mask, pos):
+    tree = {}
+    while True:
+        start = pos
+        while pos < len(mask) and mask[pos] not in ",()":
+            pos += 1
+        path = mask[start:pos].strip().split("/")
+        if not all(path):
+            raise ValueError(f"campo vacío en la posición {start}")
+        subtree = None
+        if pos < len(mask) and mask[pos] == "(":
+            subtree, pos = _parse_field_list(mask, pos + 1)
+            if pos >= len(mask) or mask[pos] != ")":
+                raise ValueError("falta ')'")
+            pos += 1
+        # 'a/b(c)' equivale a 'a(b(c))'
+        for name in reversed(path[1:]):
+            subtree = {name: subtree}
+        _merge_field(tree, path[0], subtree)
+        if pos < len(mask) and mask[pos] == ",":
+            pos += 1
+            continue
+        return tree, pos
+
+
+def _merge_field(node, name, subtree):
+    if subtree is None or (name in node and node[name] is None):
+        node[name] = None # Pedir el campo entero incluye cualquier subcampo
+    else:
+        existing = node.setdefault(name, {})
+        for key, value in subtree.items():
+            _merge_field(existing, key, value)
+
+
+def apply_fields(value, tree):
+    """Deja en 'value' solo los campos del árbol (las listas se filtran elemento a elemento)."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(element, tree) for element in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: apply_fields(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+
+def error_response(status, reason, message):
+    """Respuesta de error con el mismo formato que la API real (el 'reason' es lo que miran los reintentos)."""
+    return status, {'error': {'code': status, 'message': message,
+                              'errors': [{'reason': reason, 'domain': "youtube.fake", 'message': message}]}}
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Conexiones persistentes, como la API real
+    # Cabeceras y cuerpo salen en escrituras separadas: con Nagle y el ACK retardado cada
+    # petición tras la primera de la conexión esperaría ~40 ms, que no existen en la API real
+    disable_nagle_algorithm = True
+    api = None # FakeYouTubeApi, asignada por make_server()
+
+    def log_message(self, format, *args):
+        pass # Sin una línea por petición: con canales grandes serían cientos de miles
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, payload, content_type="application/json; charset=UTF-8", cacheable=False):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        if cacheable and status == 200:
+            # Mismas cabeceras de caché que la API real: siempre hay que revalidar
+            etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                status, data = 304, b""
+                with self.api._lock:
+                    self.api.not_modified += 1
+        with self.api._lock:
+            self.api.bytes_sent += len(data)
+        self.send_response(status)
+        if cacheable and status in (200, 304):
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "private, max-age=0, must-revalidate, no-transform")
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, http_method):
+        url = urlsplit(self.path)
+        body = self._body()
+        if url.path == "/_stats":
+            return self._send(200, self.api.stats())
+        if url.path == "/_reset":
+            self.api.reset()
+            return self._send(200, {'reset': True})
+        with self.api._lock:
+            self.api.http_requests += 1
+        self.api._delay()
+        if url.path.rstrip("/").endswith("/batch") or url.path.rstrip("/").endswith("batch/youtube/v3"):
+            content_type, data = self.api.handle_batch(self.headers.get("Content-Type", ""), body)
+            return self._send(200, data, content_type)
+        status, payload = self.api.handle(http_method, url.path, url.query, body)
+        self._send(status, payload, cacheable=http_method == "GET")
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+
+def make_server(api, host="127.0.0.1", port=0):
+    """Crea (sin arrancar) el servidor HTTP para 'api'. Con port=0 se elige un puerto libre."""
+    handler = type("BoundFakeApiHandler", (FakeApiHandler,), {'api': api})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(api, host="127.0.0.1", port=0):
+    """Arranca el servidor en un hilo daemon. Devuelve (servidor, URL base para YOUTUBE_API_ENDPOINT)."""
+    server = make_server(api, host, port)
+    threading.Thread(target=server.serve_forever, name="fake-youtube-api", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servidor local que imita la YouTube Data API v3.")
+    parser.add_argument("--videos", type=int, nargs="+", default=[1000],
+                        help="Videos de cada canal sintético (uno por valor; el primero es el canal 'mine').")
+    parser.add_argument("--year", type=int, default=2025, help="Año en el que se publican los videos sintéticos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia fija por petición HTTP.")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="Latencia aleatoria adicional (0..N ms).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de llamadas que fallan con 503.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fracción de llamadas que fallan con 403 rateLimitExceeded.")
+    parser.add_argument("--quota-limit", type=int, default=None,
+                        help="Unidades de cuota tras las que se responde quotaExceeded.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    api = FakeYouTubeApi(args.videos, args.year, args.latency_ms, args.latency_jitter_ms,
+                         args.error_rate, args.rate_limit_rate, args.quota_limit, args.seed)
+    server = make_server(api, args.host, args.port)
+    print(f"Servidor falso de la YouTube API en http://{args.host}:{server.server_address[1]}/ "
+          f"({', '.join(str(len(channel)) for channel in api.channels)} videos). Ctrl+C para salir.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Mide los scripts contra el servidor falso de la API: tiempo, peticiones, cuota y memoria pico.
+
+Por cada tamaño de canal arranca benchmarks/fake_youtube_api.py en este proceso y ejecuta
+cada escenario como un proceso aparte, en su propia carpeta temporal (instantánea, diario,
+contador de cuota y CSV no se mezclan entre ejecuciones):
+
+    python benchmarks/run_benchmarks.py --sizes 100 1000 10000 --latency-ms 30
+
+Escenarios:
+    generar              generar_csv_videos.py con la instantánea vacía
+    generar-incremental  generar_csv_videos.py con la instantánea caliente (su carpeta se prepara
+                         antes con una ejecución completa, que no se mide)
+    actualizar           actualizar_metadata_videos.py, una petición por video
+    actualizar-batch     actualizar_metadata_videos.py --batch
+
+ocultar_likes_videos.py no hace llamadas a la API, así que no tiene escenario.
+Cada resultado se añade también como una línea JSON a --output.
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+import fake_youtube_api
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GENERAR_SCRIPT = os.path.join(REPO_DIR, "generar_csv_videos.py")
+ACTUALIZAR_SCRIPT = os.path.join(REPO_DIR, "actualizar_metadata_videos.py")
+ACTUALIZAR_CSV = "videos_a_actualizar.csv" # CSV_FILENAME de actualizar_metadata_videos.py
+SCENARIOS = ["generar", "generar-incremental", "actualizar", "actualizar-batch"]
+DEFAULT_SIZES = [100, 1000, 10000]
+# Una actualización cuesta 50 unidades: con la cuota diaria por defecto (10.000) caben ~190
+DEFAULT_UPDATE_ROWS = 100
+RESULTS_FILE = "benchmark_results.jsonl"
+
+
+def run_script(script, args, workdir, endpoint, log_name):
+    """Ejecuta un script contra el servidor falso. Devuelve (código de salida, segundos, MB de memoria pico)."""
+    env = dict(os.environ, YOUTUBE_API_ENDPOINT=endpoint, PYTHONUNBUFFERED="1")
+    with open(os.path.join(workdir, log_name), "w", encoding="utf-8") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, script, *args], cwd=workdir, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            # wait4 da el uso de recursos de ESTE hijo (RUSAGE_CHILDREN acumularía todos)
+            _, status, usage = os.wait4(process.pid, 0)
+            elapsed = time.perf_counter() - start
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss está en KB en Linux y en bytes en macOS
+            divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+            peak_mb = usage.ru_maxrss / divisor
+        else:
+            process.wait()
+            elapsed = time.perf_counter() - start
+            peak_mb = None
+    return process.returncode, elapsed, peak_mb
+
+
+def write_update_csv(api, workdir, rows):
+    """CSV de entrada de actualizar_metadata_videos.py con título y descripción nuevos para 'rows' videos."""
+    video_ids = api.channels[0].video_ids[:rows]
+    with open(os.path.join(workdir, ACTUALIZAR_CSV), "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=['Título Corregido', 'ID de YouTube', 'Descripción'])
+        writer.writeheader()
+        for i, video_id in enumerate(video_ids):
+            writer.writerow({'Título Corregido': f"Título corregido {i}", 'ID de YouTube': video_id,
+                             'Descripción': f"Descripción corregida del video {i}."})
+    return len(video_ids)
+
+
+def fetch_stats(endpoint):
+    with urllib.request.urlopen(endpoint + "_stats") as response:
+        return json.load(response)
+
+
+def run_scenario(name, api, endpoint, args):
+    """Ejecuta un escenario en su propia carpeta temporal y devuelve su registro de resultados."""
+    workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    if name.startswith("generar"):
+        script, script_args = GENERAR_SCRIPT, []
+        if name == "generar-incremental":
+            # Instantánea caliente: una ejecución completa previa en la misma carpeta (no se mide)
+            api.reset()
+            exit_code, _, _ = run_script(script, script_args, workdir, endpoint, "generar-inicial.log")
+            if exit_code != 0:
+                print(f"  Aviso: la ejecución inicial de {name} terminó con código {exit_code}.")
+    else:
+        write_update_csv(api, workdir, args.update_rows)
+        script = ACTUALIZAR_SCRIPT
+        script_args = ["--batch"] if name == "actualizar-batch" else []
+
+    api.reset()
+    exit_code, elapsed, peak_mb = run_script(script, script_args, workdir, endpoint, f"{name}.log")
+    stats = fetch_stats(endpoint)
+    return {
+        'scenario': name,
+        'videos': len(api.channels[0]),
+        'exit_code': exit_code,
+        'wall_s': round(elapsed, 3),
+        'http_requests': stats['http_requests'],
+        'not_modified': stats['not_modified'],
+        'bytes_sent': stats['bytes_sent'],
+        'api_calls': sum(stats['requests'].values()),
+        'calls_by_method': stats['requests'],
+        'quota_units': stats['quota_units'],
+        'injected_errors': stats['injected_errors'],
+        'peak_rss_mb': round(peak_mb, 1) if peak_mb is not None else None,
+        'latency_ms': args.latency_ms,
+        'error_rate': args.error_rate,
+        'workdir': workdir,
+    }
+
+
+def print_result(result):
+    rss = f"{result['peak_rss_mb']:.1f} MB" if result['peak_rss_mb'] is not None else "n/d"
+    status = "" if result['exit_code'] == 0 else f"  (código de salida {result['exit_code']})"
+    print(f"  {result['scenario']:<20} {result['wall_s']:>9.2f} s  {result['api_calls']:>7} llamadas  "
+          f"{result['http_requests']:>7} HTTP  {result['bytes_sent'] / 1024:>8.0f} KB  "
+          f"{result['quota_units']:>7} unidades  {rss:>9}{status}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento contra un servidor falso de la YouTube API.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Tamaños de canal (videos) a medir, p. ej. 100 1000 10000 100000.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--update-rows", type=int, default=DEFAULT_UPDATE_ROWS,
+                        help="Filas del CSV de los escenarios de actualización.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latencia por petición HTTP del servidor falso.")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de llamadas que fallan con 503.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fracción de llamadas que fallan con 403 rateLimitExceeded.")
+    parser.add_argument("--quota-limit", type=int, default=None, help="Cuota del servidor falso (sin límite por defecto).")
+    parser.add_argument("--keep", action="store_true", help="No borra las carpetas temporales (registros y salidas).")
+    parser.add_argument("--output", default=RESULTS_FILE, help="Archivo JSONL donde se añaden los resultados.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started_at = datetime.now().isoformat(timespec='seconds')
+    with open(args.output, "a", encoding="utf-8") as output:
+        for size in args.sizes:
+            api = fake_youtube_api.FakeYouTubeApi(
+                [size], latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+                error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, quota_limit=args.quota_limit
+            )
+            server, endpoint = fake_youtube_api.start_in_thread(api)
+            print(f"\n--- Canal sintético de {size} videos ({endpoint}) ---")
+            try:
+                for name in args.scenarios:
+                    result = run_scenario(name, api, endpoint, args)
+                    result['started_at'] = started_at
+                    print_result(result)
+                    output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    output.flush()
+                    if not args.keep:
+                        shutil.rmtree(result['workdir'], ignore_errors=True)
+            finally:
+                server.shutdown()
+                server.server_close()
+    print(f"\nResultados añadidos a '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
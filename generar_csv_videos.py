@@ -1,19 +1,38 @@
 import os
 import csv
-import pickle
-from datetime import datetime # Para manejar fechas de publicación
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from datetime import datetime, timezone # Para manejar fechas de publicación
+from google.auth.exceptions import RefreshError
 from googleapiclient.errors import HttpError
-import sys # Para salir si hay errores críticos
+import heapq # Para el ranking sin NumPy
 import math # Para calcular lotes
+import sqlite3 # Para la instantánea local del canal
+import time
+import json # Para la instantánea local del canal
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from youtube_core import (
+    CredentialsManager,
+    OUTPUT_EXTENSIONS,
+    QuotaExceededError,
+    VideoRecord,
+    VideoTable,
+    check_output_formats,
+    compact_value,
+    enable_quota_ledger,
+    enable_response_cache,
+    enable_tracing,
+    execute_with_retry,
+    get_credentials,
+    get_thread_http,
+    numpy_available,
+    open_writer,
+    quota_cost,
+)
+from youtube_core import auth as core_auth
 
 ### CONFIGURACIÓN ###
 CLIENT_SECRETS_FILE = "client_secret.json" # Nombre del archivo descargado (asegúrate que exista)
 SCOPES = ["https://www.googleapis.com/auth/youtube.readonly"] # Permiso de solo lectura
-API_SERVICE_NAME = "youtube"
-API_VERSION = "v3"
 
 # --- AJUSTE DE AÑO ---
 # Pon el año específico (ej. 2025) o None para obtener todos los años.
@@ -23,66 +42,120 @@ TARGET_YEAR = 2025 # Ejemplo para obtener solo los de 2025
 # Nombre del archivo para guardar el token de acceso (evita re-autorizar cada vez)
 TOKEN_PICKLE_FILE = 'token_youtube_readonly.pickle'
 # El nombre del archivo CSV de salida se generará dinámicamente más abajo
-# ------------------
 
-def get_authenticated_service():
-    """Autentica al usuario usando OAuth 2.0 y devuelve un objeto de servicio API."""
-    credentials = None
-    if os.path.exists(TOKEN_PICKLE_FILE):
-        with open(TOKEN_PICKLE_FILE, 'rb') as token:
-            try:
-                credentials = pickle.load(token)
-            except (pickle.UnpicklingError, EOFError):
-                 print(f"Advertencia: No se pudo leer {TOKEN_PICKLE_FILE}. Se solicitará autorización.")
-                 credentials = None
-
-    if not credentials or not credentials.valid:
-        if credentials and credentials.expired and credentials.refresh_token:
-            print("Refrescando token de acceso...")
-            try:
-                credentials.refresh(Request())
-            except Exception as e:
-                print(f"Error al refrescar el token: {e}. Se requiere nueva autorización.")
-                if os.path.exists(TOKEN_PICKLE_FILE):
-                    os.remove(TOKEN_PICKLE_FILE)
-                credentials = None
-                flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
-                credentials = flow.run_local_server(port=0)
-        else:
-            if not os.path.exists(CLIENT_SECRETS_FILE):
-                print(f"Error Crítico: No se encuentra el archivo '{CLIENT_SECRETS_FILE}'.")
-                print("Asegúrate de haber descargado el archivo JSON de credenciales y guardado con ese nombre.")
-                sys.exit(1)
+# --- INSTANTÁNEA LOCAL (sincronización incremental) ---
+# Base de datos SQLite con los videos ya conocidos del canal y sus estadísticas
+SNAPSHOT_DB_FILE = 'snapshot_videos.sqlite3'
+# Las estadísticas más antiguas que esto (en horas) se vuelven a pedir a la API
+STATS_TTL_HOURS = 24
+# Pon True para ignorar la instantánea y recorrer de nuevo toda la playlist
+FULL_RESYNC = False
 
-            print("Se necesita autorización. Abriendo navegador...")
-            flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
-            credentials = flow.run_local_server(port=0)
+# --- MODO STREAMING ---
+# Pon True para escribir el CSV a medida que llegan las páginas, sin guardar nada en memoria
+# ni en la instantánea (recorre siempre la playlist, hasta TARGET_YEAR si está definido).
+STREAMING_MODE = False
+# La API permite hasta 50 IDs por cada llamada a videos().list
+STATS_BATCH_SIZE = 50
 
-        with open(TOKEN_PICKLE_FILE, 'wb') as token:
-            pickle.dump(credentials, token)
-            print(f"Credenciales guardadas en '{TOKEN_PICKLE_FILE}' para futuras ejecuciones.")
+# --- COLUMNAS DEL CSV ---
+# Columnas por video que se pueden exportar: el campo de videos().list que lee cada una
+# ('parte/campo'), cómo se obtiene su valor del item y si es un recuento (int64 en los
+# formatos tipados). Las partes de todas las columnas elegidas se piden juntas, en UNA
+# llamada por cada lote de 50 videos, y la respuesta trae solo esos campos (ver get_video_fields).
+VIDEO_COLUMNS = {
+    'Likes':       ('statistics/likeCount',     lambda item: item.get('statistics', {}).get('likeCount', 'N/A'), True),
+    'Vistas':      ('statistics/viewCount',     lambda item: item.get('statistics', {}).get('viewCount', 'N/A'), True),
+    'Comentarios': ('statistics/commentCount',  lambda item: item.get('statistics', {}).get('commentCount', 'N/A'), True),
+    'Duración':    ('contentDetails/duration',  lambda item: item.get('contentDetails', {}).get('duration', 'N/A'), False),
+    'Privacidad':  ('status/privacyStatus',     lambda item: item.get('status', {}).get('privacyStatus', 'N/A'), False),
+    'Etiquetas':   ('snippet/tags',             lambda item: '|'.join(item.get('snippet', {}).get('tags', [])), False),
+}
+# Columnas elegidas (en este orden), además del título y el ID
+EXPORT_COLUMNS = ['Likes']
 
-    try:
-        youtube_service = build(API_SERVICE_NAME, API_VERSION, credentials=credentials)
-        print("Servicio de YouTube autenticado correctamente.")
-        return youtube_service
-    except HttpError as e:
-        print(f"Error construyendo el servicio API: {e.resp.status} {e.content}")
-        if os.path.exists(TOKEN_PICKLE_FILE):
-            print(f"Intenta eliminar el archivo '{TOKEN_PICKLE_FILE}' y ejecutar el script de nuevo.")
-        return None
-    except Exception as e:
-        print(f"Error inesperado construyendo el servicio: {e}")
-        return None
+# --- POST-PROCESO (vectorizado con NumPy si está instalado) ---
+# Rango de fechas opcional ('AAAA-MM-DD', ambas incluidas) dentro de lo recuperado, p. ej. ("2025-03-01", "2025-06-30")
+DATE_RANGE = (None, None)
+# Cuántos videos mostrar en el ranking por likes (y por vistas, si se exportan)
+TOP_N = 5
+# Pon True para mostrar videos y likes totales por mes de publicación (necesita NumPy)
+MONTHLY_SUMMARY = False
+
+# --- FORMATOS DE SALIDA ---
+# Se escriben todos a la vez desde las mismas filas: 'csv', 'jsonl.gz' (JSON por línea
+# comprimido), 'parquet' y 'arrow' (estos dos necesitan pyarrow; recuentos como int64)
+OUTPUT_FORMATS = ['csv']
+# Los videos se guardan como registros compactos (VideoRecord); las filas (diccionarios) de
+# los escritores se crean en lotes de este tamaño justo antes de escribirlas
+WRITE_BATCH_SIZE = 1000
+
+# --- PAGINACIÓN Y MÉTRICAS ---
+# Items por página de playlistItems().list (máximo de la API: 50; sin indicarlo la API usa 5)
+PLAYLIST_PAGE_SIZE = 50
+# Con instantánea, la primera página se pide más pequeña: lo normal es que solo haya unos
+# pocos videos nuevos antes del primero conocido. Las siguientes usan PLAYLIST_PAGE_SIZE.
+PLAYLIST_HEAD_PAGE_SIZE = 10
+# Campos que se piden de cada página de la playlist y del canal (parámetro 'fields'): la
+# API omite el resto del snippet (descripción, miniaturas...), que es la mayor parte de la respuesta
+PLAYLIST_FIELDS = "nextPageToken,items(snippet(publishedAt,title,resourceId/videoId))"
+CHANNEL_FIELDS = "items(contentDetails/relatedPlaylists/uploads)"
+# Archivo donde se añade (una línea JSON por ejecución) el resumen de la traza
+METRICS_FILE = 'metrics_runs.jsonl'
+# Traza JSONL con una línea por cada llamada a la API (None para no guardarla)
+TRACE_FILE = 'trace_generar.jsonl'
+# Caché en disco de las respuestas (revalidada con ETag: lo que no cambió no se vuelve a
+# descargar, aunque la llamada sí gasta cuota). None para desactivarla
+HTTP_CACHE_DIR = '.http_cache'
+# Tamaño máximo de la caché; al superarlo se borran las respuestas usadas hace más tiempo
+HTTP_CACHE_MAX_MB = 200
+# Pon True para ver el progreso de cada página y cada lote (con canales grandes, escribir
+# tantas líneas en la consola cuesta más que el propio proceso)
+VERBOSE = False
+# Máximo de llamadas de estadísticas en vuelo a la vez, solapadas con la paginación
+STATS_CONCURRENCY = 4
+
+# --- MULTICANAL ---
+# Exportar varios canales a la vez, cada uno en su propio proceso. Cada entrada es un archivo
+# de token ('.pickle', exporta el canal autorizado con ese token) o un ID de canal 'UC...'
+# (se lee con TOKEN_PICKLE_FILE y solo se ven sus videos públicos). Los tokens deben existir:
+# créalos antes ejecutando el script con TOKEN_PICKLE_FILE apuntando a cada uno.
+# Lista vacía = solo el canal de TOKEN_PICKLE_FILE.
+MULTI_CHANNEL_SOURCES = []
+MULTI_CHANNEL_WORKERS = 4
+# True: además del CSV de cada canal, se genera uno combinado con la columna 'Canal'
+MULTI_CHANNEL_MERGE = True
+
+# --- MODO VIGILANCIA ---
+# True: el script no termina. Conserva el servicio autenticado y los videos del canal en
+# memoria; cada WATCH_POLL_MINUTES mira solo la cabeza de la playlist, refresca por lotes las
+# estadísticas más antiguas (repartiendo WATCH_DAILY_QUOTA a lo largo del día) y reescribe la
+# salida solo si algo cambió. Se detiene con Ctrl+C. No admite MULTI_CHANNEL_SOURCES.
+WATCH_MODE = False
+WATCH_POLL_MINUTES = 10
+# Unidades diarias que puede gastar el modo vigilancia (el resto queda para los otros scripts).
+# Lo gastado se anota en el contador de cuota compartido, así que un reinicio no lo pone a cero
+WATCH_DAILY_QUOTA = 5000
+# Nombre con el que el modo vigilancia anota su parte en el contador de cuota
+WATCH_QUOTA_SHARE = "watch"
+# ------------------
 
-def get_channel_uploads_playlist_id(youtube):
-    """Obtiene el ID de la playlist 'Uploads' del canal autenticado."""
+def get_authenticated_service():
+    """Devuelve el servicio API autenticado (solo lectura), compartido en todo el proceso."""
+    return core_auth.get_authenticated_service(TOKEN_PICKLE_FILE, SCOPES, CLIENT_SECRETS_FILE)
+
+def get_channel_uploads_playlist_id(youtube, channel_id=None):
+    """Obtiene el ID de la playlist 'Uploads' del canal autenticado (o del canal 'channel_id')."""
+    if channel_id and channel_id.startswith("UC"):
+        # La playlist de subidas de un canal 'UC...' es 'UU...': no hace falta llamar a la API
+        return "UU" + channel_id[2:]
     try:
         print("Obteniendo ID de la playlist de subidas del canal...")
-        channels_response = youtube.channels().list(
-            part="contentDetails",
-            mine=True
-        ).execute()
+        if channel_id:
+            request = youtube.channels().list(part="contentDetails", id=channel_id, fields=CHANNEL_FIELDS)
+        else:
+            request = youtube.channels().list(part="contentDetails", mine=True, fields=CHANNEL_FIELDS)
+        channels_response = execute_with_retry(request)
 
         if not channels_response.get("items"):
             print("Error: No se pudo encontrar información del canal para el usuario autenticado.")
@@ -92,6 +165,9 @@ def get_channel_uploads_playlist_id(youtube):
         print(f"ID de Playlist 'Uploads' encontrado: {playlist_id}")
         return playlist_id
 
+    except QuotaExceededError:
+        print("Error: cuota diaria de la API agotada obteniendo datos del canal.")
+        return None
     except HttpError as e:
         print(f"Error HTTP obteniendo datos del canal: {e.resp.status} {e.content}")
         return None
@@ -99,221 +175,1131 @@ def get_channel_uploads_playlist_id(youtube):
         print(f"Error inesperado obteniendo datos del canal: {e}")
         return None
 
-def get_all_videos_from_playlist(youtube, playlist_id):
-    """Recupera todos los items (videos) de una playlist, manejando paginación."""
-    videos = []
-    next_page_token = None
+# Motivos por los que termina la paginación de get_all_videos_from_playlist
+STOP_END = "end"       # Se llegó al final de la playlist
+STOP_KNOWN = "known"   # Se alcanzó un video ya guardado en la instantánea
+STOP_YEAR = "year"     # Se alcanzaron videos anteriores a target_year
+STOP_ERROR = "error"   # Un error cortó la paginación
+STOP_QUOTA = "quota"   # Se agotó la cuota diaria (state['resume_page_token'] indica dónde)
+
+def iter_playlist_pages(youtube, playlist_id, known_ids=None, target_year=None, state=None, page_token=None):
+    """Genera, página a página, los items (videos) de una playlist.
+
+    La playlist de subidas va de más nuevo a más antiguo, así que la paginación se detiene
+    en el primer video ya conocido ('known_ids') o en el primero publicado antes de
+    'target_year': a partir de ahí no queda nada útil. Los items más nuevos que el año se
+    generan igualmente (vienen en las mismas páginas y la instantánea los necesita).
+    Al terminar deja en state['stop_reason'] uno de los valores STOP_*. Los errores
+    transitorios se reintentan sobre la misma página (mismo pageToken). Con 'page_token' el
+    recorrido empieza en esa página; antes de generar cada página se deja en
+    state['next_page_token'] el pageToken de la siguiente (None si es la última).
+    """
+    state = state if state is not None else {}
+    next_page_token = page_token
     count = 0
+    known_ids = known_ids or set()
+    page_size = max(1, min(PLAYLIST_PAGE_SIZE, 50))
+    # Con instantánea, empezar con una página pequeña: probablemente haya pocos videos nuevos
+    current_page_size = min(PLAYLIST_HEAD_PAGE_SIZE, page_size) if known_ids else page_size
 
     print(f"Recuperando lista de videos de la playlist {playlist_id}...")
     while True:
         try:
             request = youtube.playlistItems().list(
                 part="snippet", # Solo necesitamos snippet (título, fecha pub, ID recurso)
+                fields=PLAYLIST_FIELDS,
                 playlistId=playlist_id,
-                # ¡ADVERTENCIA SOBRE maxResults!
-                # Se ha quitado maxResults=50 según solicitado.
-                # ESTO HARÁ QUE LA API USE EL VALOR POR DEFECTO (5),
-                # HACIENDO EL SCRIPT MÁS LENTO Y CONSUMIENDO MÁS CUOTA.
-                # Se recomienda volver a añadir: maxResults=50,
+                maxResults=current_page_size, # Sin maxResults la API devuelve solo 5 por página
                 pageToken=next_page_token
             )
-            response = request.execute()
+            response = execute_with_retry(request)
+        except QuotaExceededError:
+            print(f"\nCuota diaria agotada durante la paginación tras {count} videos.")
+            print(f"Se detiene la recuperación en la página con pageToken={next_page_token!r}.")
+            state['stop_reason'] = STOP_QUOTA
+            state['resume_page_token'] = next_page_token
+            return
+        except HttpError as e:
+            print(f"\nError HTTP durante la paginación de videos: {e.resp.status} {e.content}")
+            print("Se agotaron los reintentos o el error no es transitorio. Se detiene la recuperación.")
+            state['stop_reason'] = STOP_ERROR
+            return
+        except Exception as e:
+            print(f"\nError inesperado durante la paginación de videos: {e}")
+            state['stop_reason'] = STOP_ERROR
+            return
+
+        page = []
+        stop_reason = None
+        for item in response.get("items", []):
+            snippet = item.get("snippet", {})
+            if snippet.get("resourceId", {}).get("videoId") in known_ids:
+                stop_reason = STOP_KNOWN
+                break
+            published_at = snippet.get("publishedAt") or ""
+            if target_year is not None and published_at[:4].isdigit() and int(published_at[:4]) < target_year:
+                stop_reason = STOP_YEAR
+                break
+            page.append(item)
+        count += len(page)
+        state['next_page_token'] = response.get("nextPageToken")
+        if page:
+            yield page
 
-            items = response.get("items", [])
-            videos.extend(items)
-            count += len(items)
-            # Imprimir progreso con menos frecuencia si maxResults es bajo
-            if count % 50 == 0 or not response.get("nextPageToken"): # Imprime cada 50 o al final
-                 print(f"Recuperados {count} videos hasta ahora...")
+        if stop_reason == STOP_KNOWN:
+            print(f"Alcanzado un video ya guardado en la instantánea. {count} videos nuevos.")
+            state['stop_reason'] = STOP_KNOWN
+            return
+        if stop_reason == STOP_YEAR:
+            print(f"Alcanzados videos anteriores a {target_year}. Se detiene la paginación con {count} videos.")
+            state['stop_reason'] = STOP_YEAR
+            return
+        if VERBOSE:
+            print(f"Recuperados {count} videos hasta ahora...")
 
+        next_page_token = response.get("nextPageToken")
+        current_page_size = page_size
 
-            next_page_token = response.get("nextPageToken")
+        if not next_page_token:
+            print("Se han recuperado todos los videos de la playlist.")
+            state['stop_reason'] = STOP_END
+            return
 
-            if not next_page_token:
-                print("Se han recuperado todos los videos de la playlist.")
-                break
+def get_all_videos_from_playlist(youtube, playlist_id, known_ids=None, target_year=None):
+    """Recupera los videos de una playlist (ver iter_playlist_pages) como registros VideoRecord.
 
-        except HttpError as e:
-            print(f"\nError HTTP durante la paginación de videos: {e.resp.status} {e.content}")
-            print("Puede ser un problema temporal o de cuota. Se detiene la recuperación.")
-            break
-        except Exception as e:
-            print(f"\nError inesperado durante la paginación de videos: {e}")
-            break
+    Devuelve (videos, motivo_de_parada), con uno de los valores STOP_*. Los items de la API
+    se descartan en cuanto se extraen sus campos.
+    """
+    state = {}
+    videos = []
+    for page in iter_playlist_pages(youtube, playlist_id, known_ids, target_year, state):
+        videos.extend(VideoRecord.from_playlist_item(item) for item in page)
 
     print(f"Total de videos recuperados de la playlist: {len(videos)}")
-    return videos
+    return videos, state['stop_reason']
 
-def get_video_statistics(youtube, video_ids):
-    """Obtiene estadísticas (como likes) para una lista de IDs de vídeo."""
-    stats = {}
-    # La API permite hasta 50 IDs por solicitud
-    batch_size = 50
-    num_batches = math.ceil(len(video_ids) / batch_size)
-    print(f"\nObteniendo estadísticas para {len(video_ids)} vídeos en {num_batches} lotes...")
-
-    for i in range(num_batches):
-        start_index = i * batch_size
-        end_index = start_index + batch_size
-        batch_ids = video_ids[start_index:end_index]
-        ids_string = ",".join(batch_ids)
-        print(f"Procesando lote {i+1}/{num_batches} ({len(batch_ids)} vídeos)...")
+def csv_fieldnames():
+    """Columnas de la salida: título, ID y las EXPORT_COLUMNS actuales."""
+    return ['Título del video', 'ID de youtube'] + EXPORT_COLUMNS
 
-        try:
-            request = youtube.videos().list(
-                part="statistics", # Solo necesitamos las estadísticas
-                id=ids_string
-            )
-            response = request.execute()
+def int_columns():
+    """Columnas de EXPORT_COLUMNS que se guardan como enteros (null si no hay número) en los formatos tipados."""
+    return {column for column in EXPORT_COLUMNS if VIDEO_COLUMNS[column][2]}
+
+def get_video_parts(columns=None):
+    """Conjunto mínimo de 'part' de videos().list que cubre las columnas pedidas, como texto."""
+    if columns is None:
+        columns = EXPORT_COLUMNS # Se lee en cada llamada: si se cambia EXPORT_COLUMNS, vale el valor nuevo
+    return ",".join(sorted({VIDEO_COLUMNS[column][0].split("/")[0] for column in columns}))
 
-            for item in response.get("items", []):
-                video_id = item.get("id")
-                statistics = item.get("statistics", {})
+def get_video_fields(columns=None):
+    """Máscara 'fields' de videos().list con solo el ID y los campos de las columnas pedidas.
+
+    Por ejemplo, 'items(id,statistics(likeCount,viewCount))' para Likes y Vistas.
+    """
+    if columns is None:
+        columns = EXPORT_COLUMNS
+    fields_by_part = {}
+    for column in columns:
+        part, field = VIDEO_COLUMNS[column][0].split("/", 1)
+        fields_by_part.setdefault(part, set()).add(field)
+    masks = [f"{part}({','.join(sorted(fields))})" for part, fields in sorted(fields_by_part.items())]
+    return f"items({','.join(['id'] + masks)})"
+
+def fetch_statistics_batch(youtube, batch_ids, batch_label, credentials=None, columns=None):
+    """Obtiene las columnas de un lote de hasta 50 IDs en una sola llamada.
+
+    Devuelve {video_id: valores}, con los valores en el orden de 'columns' (los recuentos como
+    int); si el lote falla, todas sus columnas valen "Error".
+    Con 'credentials' la llamada usa el transporte HTTP del hilo actual (para el pool de hilos).
+    """
+    if columns is None:
+        columns = EXPORT_COLUMNS
+    stats = {}
+    try:
+        request = youtube.videos().list(
+            part=get_video_parts(columns), # Solo las partes que necesitan las columnas elegidas
+            fields=get_video_fields(columns),
+            id=",".join(batch_ids)
+        )
+        response = execute_with_retry(request, http=get_thread_http(credentials) if credentials else None)
+
+        for item in response.get("items", []):
+            video_id = item.get("id")
+            if video_id:
                 # El recuento de 'likes' puede no estar disponible si el propietario los oculta
-                like_count = statistics.get("likeCount", "N/A")
-                if video_id:
-                    stats[video_id] = like_count
+                stats[video_id] = tuple(
+                    compact_value(VIDEO_COLUMNS[column][1](item), VIDEO_COLUMNS[column][2]) for column in columns
+                )
 
-        except HttpError as e:
-            print(f"Error HTTP obteniendo estadísticas para lote {i+1}: {e.resp.status} {e.content}")
-            # Marcar los vídeos de este lote como no disponibles
-            for vid in batch_ids:
-                if vid not in stats:
-                    stats[vid] = "Error"
-        except Exception as e:
-            print(f"Error inesperado obteniendo estadísticas para lote {i+1}: {e}")
-            for vid in batch_ids:
-                 if vid not in stats:
-                    stats[vid] = "Error"
+    except HttpError as e:
+        print(f"Error HTTP obteniendo estadísticas para lote {batch_label}: {e.resp.status} {e.content}")
+        # Marcar los vídeos de este lote como no disponibles
+        for vid in batch_ids:
+            if vid not in stats:
+                stats[vid] = ("Error",) * len(columns)
+    except QuotaExceededError:
+        raise # Se detiene la ejecución: el resto de lotes fallaría igual
+    except Exception as e:
+        print(f"Error inesperado obteniendo estadísticas para lote {batch_label}: {e}")
+        for vid in batch_ids:
+             if vid not in stats:
+                stats[vid] = ("Error",) * len(columns)
+    return stats
+
+def missing_video_data(columns=None):
+    """Valores de las columnas para un video sin datos (no encontrado o sin pedir)."""
+    if columns is None:
+        columns = EXPORT_COLUMNS
+    return ("N/A",) * len(columns)
+
+def values_from_data(data, columns=None):
+    """Valores compactos de las columnas a partir de un diccionario {columna: valor} (None si no hay)."""
+    if columns is None:
+        columns = EXPORT_COLUMNS
+    if not data:
+        return None
+    return tuple(compact_value(data.get(column, "N/A"), VIDEO_COLUMNS[column][2]) for column in columns)
+
+def video_row(record, columns=None):
+    """Fila de salida (diccionario con las columnas de csv_fieldnames()) de un registro."""
+    if columns is None:
+        columns = EXPORT_COLUMNS
+    row = {'Título del video': record.title, 'ID de youtube': record.video_id}
+    row.update(zip(columns, record.values or missing_video_data(columns)))
+    return row
+
+def iter_row_batches(records, batch_size=WRITE_BATCH_SIZE):
+    """Filas de salida de 'records' en lotes: nunca existen todos los diccionarios a la vez."""
+    for start in range(0, len(records), batch_size):
+        yield [video_row(record) for record in records[start:start + batch_size]]
+
+def get_video_statistics(youtube, video_ids, credentials=None):
+    """Obtiene las columnas elegidas (likes, vistas...) para una lista de IDs de vídeo.
+
+    Con 'credentials' cada hilo usa su propio transporte HTTP; sin ellas se usa el del
+    servicio (pensado para servicios falsos en pruebas).
+    """
+    stats = {}
+    num_batches = math.ceil(len(video_ids) / STATS_BATCH_SIZE)
+    print(f"\nObteniendo {', '.join(EXPORT_COLUMNS)} para {len(video_ids)} vídeos en {num_batches} lotes "
+          f"(part={get_video_parts()}, {STATS_CONCURRENCY} en paralelo)...")
+
+    def fetch(i):
+        start_index = i * STATS_BATCH_SIZE
+        end_index = start_index + STATS_BATCH_SIZE
+        batch_ids = video_ids[start_index:end_index]
+        if VERBOSE:
+            print(f"Procesando lote {i+1}/{num_batches} ({len(batch_ids)} vídeos)...")
+        return fetch_statistics_batch(youtube, batch_ids, i + 1, credentials)
+
+    with ThreadPoolExecutor(max_workers=STATS_CONCURRENCY) as executor:
+        try:
+            for batch_stats in executor.map(fetch, range(num_batches)):
+                stats.update(batch_stats)
+        except QuotaExceededError:
+            # Los IDs sin estadísticas quedan caducados y se pedirán en la próxima ejecución
+            print(f"Cuota diaria agotada: se obtuvieron estadísticas de {len(stats)} de {len(video_ids)} vídeos.")
+            executor.shutdown(wait=True, cancel_futures=True)
+            return stats
 
     print("Estadísticas de vídeo obtenidas.")
     return stats
 
+def iter_record_batches(pages, batch_size=STATS_BATCH_SIZE):
+    """Reagrupa las páginas de la playlist en lotes de 'batch_size' registros VideoRecord."""
+    batch = []
+    for page in pages:
+        for item in page:
+            batch.append(VideoRecord.from_playlist_item(item))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def select_batch_records(batch, target_year=None):
+    """Devuelve los registros del lote publicados en target_year (o todos)."""
+    selected = []
+    for record in batch:
+        published_at_str = record.published_at
+        title = record.title
+        if not published_at_str or not record.video_id:
+            print(f"Advertencia: Video '{title}' sin fecha o ID. Saltando.")
+            continue
+        try:
+            published_date = datetime.fromisoformat(published_at_str.replace('Z', '+00:00'))
+        except ValueError:
+            print(f"Advertencia: Formato de fecha inesperado '{published_at_str}' para video '{title}'. Saltando.")
+            continue
+        # Los videos más nuevos que el año pedido no llegan a pedir estadísticas
+        if target_year is None or published_date.year == target_year:
+            selected.append(record)
+    return selected
+
+def iter_enriched_rows(youtube, record_batches, target_year=None, concurrency=STATS_CONCURRENCY, credentials=None):
+    """Por cada lote de registros, pide sus columnas y genera la lista de filas del CSV de ese lote.
+
+    La llamada de estadísticas de cada lote se lanza en un pool de hilos en cuanto el lote está
+    completo, así que corre mientras se sigue paginando la playlist. Como mucho hay
+    'concurrency' llamadas en vuelo; las filas se generan en el orden de la playlist.
+    'credentials' funciona como en get_video_statistics.
+    """
+    pending = deque()
+
+    def rows_for(selected, future):
+        stats = future.result()
+        for record in selected:
+            record.values = stats.get(record.video_id)
+        return [video_row(record) for record in selected]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i, batch in enumerate(record_batches):
+            selected = select_batch_records(batch, target_year)
+            if not selected:
+                continue
+            if VERBOSE:
+                print(f"Procesando lote {i+1} ({len(selected)} vídeos)...")
+            future = executor.submit(fetch_statistics_batch, youtube,
+                                     [record.video_id for record in selected], i + 1, credentials)
+            pending.append((selected, future))
+            # Limitar las llamadas en vuelo (y la memoria) antes de pedir la siguiente página
+            while len(pending) >= concurrency:
+                yield rows_for(*pending.popleft())
+        while pending:
+            yield rows_for(*pending.popleft())
+
+def write_rows_streaming(output_files, row_batches, find_most_liked=True, progress=None):
+    """Escribe las filas en todos los formatos de 'output_files' ({formato: archivo}) a medida que llegan.
+
+    El video con más likes se calcula al pasar las filas, sin una segunda vuelta (si
+    'find_most_liked'). Devuelve (número de filas escritas, video con más likes o None).
+    Si se pasa el diccionario 'progress', se mantienen en él 'count' y 'most_liked' tras cada
+    lote, para saber qué se escribió aunque la escritura se corte con una excepción.
+    """
+    count = 0
+    video_mas_likes = None
+    max_likes = -1
+    if progress is None:
+        progress = {}
+    progress.update(count=0, most_liked=None)
+    writers = []
+    fieldnames, typed_columns = csv_fieldnames(), int_columns()
+    try:
+        for file_format, filename in output_files.items():
+            writers.append(open_writer(file_format, filename, fieldnames, typed_columns))
+        for rows in row_batches:
+            for writer in writers:
+                writer.write_rows(rows)
+            count += len(rows)
+            for video in rows if find_most_liked else ():
+                try:
+                    likes_actual = int(video.get('Likes'))
+                except (ValueError, TypeError):
+                    continue # 'N/A', 'Error', etc.
+                if likes_actual > max_likes:
+                    max_likes = likes_actual
+                    video_mas_likes = video
+            progress.update(count=count, most_liked=video_mas_likes)
+            if VERBOSE:
+                print(f"{count} filas escritas en {', '.join(output_files.values())}...")
+    finally:
+        for writer in writers:
+            writer.close()
+    return count, video_mas_likes
+
+def get_output_filename(target_year, label=None, file_format='csv'):
+    """Nombre del archivo de salida según TARGET_YEAR (y el canal, en modo multicanal)."""
+    prefix = f"videos_youtube_{label}" if label else "videos_youtube"
+    extension = OUTPUT_EXTENSIONS[file_format]
+    if target_year is None:
+        return f"{prefix}_all_years{extension}"
+    return f"{prefix}_{target_year}{extension}"
+
+def get_output_files(target_year, label=None):
+    """Archivo de salida de cada formato de OUTPUT_FORMATS, como {formato: archivo}."""
+    return {file_format: get_output_filename(target_year, label, file_format) for file_format in OUTPUT_FORMATS}
+
+def print_most_liked(video_mas_likes):
+    """Muestra el video con más likes (o un aviso si ninguno tiene un número válido)."""
+    if video_mas_likes:
+        titulo = video_mas_likes['Título del video']
+        video_id = video_mas_likes['ID de youtube']
+        likes_num = video_mas_likes['Likes'] # Mostrar el valor original (puede ser string)
+        link = f"https://www.youtube.com/watch?v={video_id}"
+        print("\n--- Vídeo con más likes ---")
+        print(f"Título: {titulo}")
+        print(f"ID: {video_id}")
+        print(f"Likes: {likes_num}")
+        print(f"Enlace: {link}")
+    else:
+        print("\nNo se encontraron vídeos con un número de likes válido para determinar el máximo.")
+
+def top_records(records, column, n, table=None):
+    """[(registro, valor)] de las 'n' filas con mayor 'column' (solo las que tienen número), de mayor a menor.
+
+    Con 'table' se calcula sobre la tabla; sin ella, fila a fila con el mismo orden (empates por posición).
+    """
+    if table is not None:
+        return [(table.records[i], int(table.counts[column][i])) for i in table.top_n(column, n)]
+    index = EXPORT_COLUMNS.index(column)
+    candidates = [(record.values[index], position) for position, record in enumerate(records)
+                  if type(record.values[index]) is int]
+    return [(records[position], value)
+            for value, position in heapq.nsmallest(n, candidates, key=lambda c: (-c[0], c[1]))]
+
+def monthly_totals(records, column, table=None):
+    """Por mes de publicación (UTC): (meses 'AAAA-MM', videos, videos con número, suma de 'column')."""
+    if table is not None:
+        return table.monthly_totals(column)
+    index = EXPORT_COLUMNS.index(column)
+    totals = {}
+    for record in records:
+        published = parse_published_at(record.published_at)
+        if published is None:
+            continue
+        month = totals.setdefault(f"{published.year:04d}-{published.month:02d}", [0, 0, 0])
+        value = record.values[index]
+        month[0] += 1
+        if type(value) is int:
+            month[1] += 1
+            month[2] += value
+    months = sorted(totals)
+    return (months, [totals[m][0] for m in months], [totals[m][1] for m in months],
+            [totals[m][2] for m in months])
+
+def print_table_summary(records, table=None):
+    """Ranking por likes (y vistas) y, si MONTHLY_SUMMARY, totales por mes.
+
+    Con la VideoTable de select_export_records se calcula vectorizado; sin NumPy, fila a fila
+    con el mismo resultado.
+    """
+    typed_columns = int_columns()
+    for column in ('Likes', 'Vistas'):
+        if column not in typed_columns:
+            continue
+        top = top_records(records, column, TOP_N, table)
+        if not top:
+            print(f"\nNo se encontraron vídeos con un número de {column.lower()} válido para el ranking.")
+            continue
+        print(f"\n--- Top {len(top)} por {column.lower()} ---")
+        for position, (video, value) in enumerate(top, start=1):
+            print(f"{position}. {video.title} ({value} {column.lower()}) "
+                  f"https://www.youtube.com/watch?v={video.video_id}")
+    if MONTHLY_SUMMARY and 'Likes' in typed_columns:
+        months, videos, with_likes, likes = monthly_totals(records, 'Likes', table)
+        print("\n--- Resumen por mes ---")
+        for month, month_videos, month_with_likes, month_likes in zip(months, videos, with_likes, likes):
+            print(f"  {month}: {month_videos} videos, {month_likes} likes "
+                  f"({month_with_likes} con likes visibles)")
+
+def export_streaming(youtube, playlist_id, output_files, target_year=TARGET_YEAR, credentials=None):
+    """Modo streaming: páginas -> lotes de 50 IDs -> filas con likes -> archivos, sin acumular nada.
+
+    Devuelve (número de filas escritas, video con más likes o None, True si la salida está
+    incompleta). Si se agota la cuota, los archivos conservan las filas ya escritas y se
+    devuelve cuántas son.
+    """
+    output_names = ", ".join(f"'{filename}'" for filename in output_files.values())
+    print(f"\nModo streaming: escribiendo en {output_names} a medida que llegan los datos...")
+    state = {}
+    progress = {}
+    pages = iter_playlist_pages(youtube, playlist_id, target_year=target_year, state=state)
+    row_batches = iter_enriched_rows(youtube, iter_record_batches(pages), target_year, credentials=credentials)
+    try:
+        count, video_mas_likes = write_rows_streaming(output_files, row_batches, progress=progress)
+    except QuotaExceededError:
+        print(f"Cuota diaria agotada: {output_names} contienen solo las {progress['count']} filas escritas hasta ahora.")
+        return progress['count'], progress['most_liked'], True
+    except IOError as e:
+        print(f"Error al escribir los archivos de salida {output_names}: {e}")
+        return 0, None, True
+
+    partial = state.get('stop_reason') in (STOP_ERROR, STOP_QUOTA)
+    if partial:
+        print("Advertencia: la paginación no terminó; la salida puede estar incompleta.")
+    if count:
+        print(f"Archivos {output_names} creados con éxito ({count} videos).")
+        print_most_liked(video_mas_likes)
+    elif target_year is None:
+        print("No se encontraron videos en total para generar el archivo CSV.")
+    else:
+        print(f"No se encontraron videos del año {target_year} para generar el archivo CSV.")
+    return count, video_mas_likes, partial
+
+def export_channel(youtube, playlist_id, label, target_year=TARGET_YEAR, credentials=None):
+    """Exporta un canal (en streaming) a sus propios archivos. Devuelve un diccionario con el resultado.
+
+    Recibe el servicio ya construido, así que se puede probar con un servicio falso.
+    """
+    output_files = get_output_files(target_year, label)
+    count, video_mas_likes, partial = export_streaming(youtube, playlist_id, output_files, target_year, credentials)
+    return {'label': label, 'files': output_files, 'count': count, 'most_liked': video_mas_likes,
+            'partial': partial}
+
+def export_channel_worker(source):
+    """Punto de entrada de cada proceso del modo multicanal ('source': token '.pickle' o ID de canal)."""
+    enable_quota_ledger() # Cada proceso cobra en el mismo contador compartido
+    trace = enable_tracing(TRACE_FILE) # Y anota sus llamadas en la misma traza
+    cache = enable_response_cache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB) if HTTP_CACHE_DIR else None
+    if source.endswith(".pickle"):
+        token_file, channel_id = source, None
+    else:
+        token_file, channel_id = TOKEN_PICKLE_FILE, source
+    if not core_auth.get_api_endpoint() and not os.path.exists(token_file):
+        # Un proceso en paralelo no puede abrir el navegador para autorizar (con un servidor
+        # alternativo, YOUTUBE_API_ENDPOINT, no hace falta token)
+        return {'source': source, 'error': f"No existe el token '{token_file}'. Créalo antes ejecutando el script con él."}
+
+    youtube = core_auth.get_authenticated_service(token_file, SCOPES, CLIENT_SECRETS_FILE)
+    if not youtube:
+        return {'source': source, 'error': "No se pudo inicializar el servicio de YouTube."}
+    playlist_id = get_channel_uploads_playlist_id(youtube, channel_id)
+    if not playlist_id:
+        return {'source': source, 'error': "No se pudo obtener la playlist de subidas."}
+
+    label = channel_id or "UC" + playlist_id[2:] # ID del canal, a partir de su playlist 'UU...'
+    result = export_channel(youtube, playlist_id, label, TARGET_YEAR, get_credentials(token_file, SCOPES))
+    result['source'] = source
+    result['trace'] = trace.snapshot() # Para el resumen de latencias del proceso principal
+    result['http_cache'] = cache.stats.to_dict() if cache else None
+    return result
+
+def export_multi_channel(sources, trace, cache=None):
+    """Exporta cada canal de 'sources' en su propio proceso y combina los resultados al terminar cada uno.
+
+    Un canal lento o limitado no retrasa a los demás: cada CSV se escribe en su proceso y el
+    combinado se va completando en el orden en que terminan. Las latencias de cada proceso
+    se suman a 'trace' (y sus contadores de caché HTTP a 'cache') para el resumen final.
+    """
+    print(f"\nModo multicanal: {len(sources)} canales con {MULTI_CHANNEL_WORKERS} procesos...")
+    merged_filename = get_output_filename(TARGET_YEAR, "multicanal")
+    # El combinado se arma con los CSV de cada canal
+    merge = MULTI_CHANNEL_MERGE and 'csv' in OUTPUT_FORMATS
+    if MULTI_CHANNEL_MERGE and not merge:
+        print("Aviso: el CSV combinado necesita 'csv' en OUTPUT_FORMATS; no se genera.")
+    merged_file = open(merged_filename, 'w', newline='', encoding='utf-8') if merge else None
+    merged_writer = None
+    if merged_file:
+        merged_writer = csv.DictWriter(merged_file, fieldnames=['Canal'] + csv_fieldnames())
+        merged_writer.writeheader()
+
+    video_mas_likes = None
+    total = 0
+    try:
+        with ProcessPoolExecutor(max_workers=MULTI_CHANNEL_WORKERS) as executor:
+            futures = {executor.submit(export_channel_worker, source): source for source in sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"\n[{source}] Error inesperado exportando el canal: {e}")
+                    continue
+                if result.get('error'):
+                    print(f"\n[{source}] {result['error']}")
+                    continue
+
+                trace.merge(result['trace'])
+                if cache and result.get('http_cache'):
+                    cache.stats.add(**result['http_cache'])
+                partial_note = " (incompleto: la exportación no terminó)" if result['partial'] else ""
+                print(f"\n[{source}] {result['count']} videos en {', '.join(result['files'].values())}{partial_note}.")
+                total += result['count']
+                most_liked = result['most_liked']
+                if most_liked and (video_mas_likes is None or int(most_liked['Likes']) > int(video_mas_likes['Likes'])):
+                    video_mas_likes = most_liked
+                if merged_writer and result['count']:
+                    with open(result['files']['csv'], newline='', encoding='utf-8') as channel_file:
+                        for row in csv.DictReader(channel_file):
+                            merged_writer.writerow({'Canal': result['label'], **row})
+                    merged_file.flush()
+    finally:
+        if merged_file:
+            merged_file.close()
+
+    print(f"\nTotal: {total} videos de {len(sources)} canales.")
+    if merged_file:
+        print(f"CSV combinado: '{merged_filename}'.")
+    print_most_liked(video_mas_likes)
+
+def build_snapshot_records(snapshot_videos, video_stats):
+    """Registros de los videos de la instantánea con sus columnas completas.
+
+    Usa los datos recién obtenidos o, si no se pidieron, los guardados en la instantánea.
+    """
+    records = []
+    for record in snapshot_videos:
+        if not record.published_at or not record.video_id:
+            print(f"Advertencia: Video '{record.title}' sin fecha o ID. Saltando.")
+            continue
+        # Valor por defecto ("N/A") si no se encontró
+        record.values = video_stats.get(record.video_id) or record.values or missing_video_data()
+        records.append(record)
+    return records
+
+def parse_published_at(value):
+    """Fecha de publicación de la API como datetime en UTC (sin zona), o None si no es válida.
+
+    Es la misma fecha que da VideoTable: las que traen otra zona horaria se pasan a UTC.
+    """
+    try:
+        published = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None
+    if published.tzinfo is not None:
+        published = published.astimezone(timezone.utc).replace(tzinfo=None)
+    return published
+
+def filter_records_by_date(records, target_year=None, date_range=(None, None)):
+    """Filtrado registro a registro por año y rango de fechas, para cuando NumPy no está instalado.
+
+    Mismo criterio que VideoTable.filter. Devuelve (seleccionados, número de registros sin fecha válida).
+    """
+    start, end = date_range
+    selected = []
+    undated = 0
+    for record in records:
+        published_date = parse_published_at(record.published_at)
+        if published_date is None:
+            undated += 1
+            continue
+        day = published_date.date().isoformat()
+        if target_year is not None and published_date.year != target_year:
+            continue
+        if (start and day < start) or (end and day > end):
+            continue
+        selected.append(record)
+    return selected, undated
+
+def open_snapshot(filename):
+    """Abre (o crea) la instantánea SQLite de videos del canal."""
+    conn = sqlite3.connect(filename)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS videos (
+            video_id TEXT PRIMARY KEY,
+            published_at TEXT NOT NULL,
+            title TEXT NOT NULL,
+            likes TEXT,
+            stats_fetched_at REAL
+        )
+    """)
+    # Instantáneas anteriores solo guardaban los likes: añadir la columna con todas las columnas
+    # exportadas (JSON {columna: valor})
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(videos)")}
+    if "video_data" not in existing:
+        conn.execute("ALTER TABLE videos ADD COLUMN video_data TEXT")
+    # 'contiguous_until': la instantánea tiene TODOS los videos publicados desde esa fecha
+    # hasta el más nuevo. "" significa que cubre la playlist entera.
+    conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+def get_contiguous_until(conn):
+    """Fecha desde la que la instantánea está completa, o None si nunca se sincronizó."""
+    row = conn.execute("SELECT value FROM sync_state WHERE key = 'contiguous_until'").fetchone()
+    return row[0] if row else None
+
+def set_contiguous_until(conn, value):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('contiguous_until', ?)", (value,))
+
+def get_resume_page_token(conn, playlist_id):
+    """pageToken donde continuar el recorrido completo interrumpido de 'playlist_id' (None si no hay)."""
+    row = conn.execute("SELECT value FROM sync_state WHERE key = 'resume_page_token'").fetchone()
+    if not row or not row[0]:
+        return None
+    resume = json.loads(row[0])
+    return resume['page_token'] if resume['playlist_id'] == playlist_id else None
+
+def set_resume_page_token(conn, playlist_id, page_token):
+    """Anota (o borra, con None) la siguiente página del recorrido completo en curso."""
+    value = json.dumps({'playlist_id': playlist_id, 'page_token': page_token}) if page_token else None
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('resume_page_token', ?)", (value,))
+
+def sync_export_columns(conn, columns=None):
+    """Si cambiaron las columnas exportadas, marca todas las estadísticas como caducadas."""
+    if columns is None:
+        columns = EXPORT_COLUMNS
+    signature = ",".join(columns)
+    row = conn.execute("SELECT value FROM sync_state WHERE key = 'export_columns'").fetchone()
+    if row and row[0] == signature:
+        return
+    with conn:
+        conn.execute("UPDATE videos SET stats_fetched_at = NULL")
+        conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('export_columns', ?)", (signature,))
+    if row:
+        print(f"Las columnas exportadas cambiaron ({row[0]} -> {signature}): se vuelven a pedir todas.")
+
+def snapshot_covers(contiguous_until, target_year):
+    """Indica si la instantánea cubre sin huecos el rango pedido (todo, o desde target_year)."""
+    if contiguous_until is None:
+        return False
+    if target_year is None:
+        return contiguous_until == ""
+    return contiguous_until <= f"{target_year:04d}-01-01"
+
+def load_known_ids(conn):
+    """Devuelve el conjunto de IDs de video guardados en la instantánea."""
+    return {row[0] for row in conn.execute("SELECT video_id FROM videos")}
+
+def save_playlist_items(conn, records):
+    """Guarda (o actualiza) título y fecha de los videos de la playlist en la instantánea."""
+    rows = [
+        (record.video_id, record.published_at, record.title)
+        for record in records if record.video_id and record.published_at
+    ]
+    with conn:
+        conn.executemany("""
+            INSERT INTO videos (video_id, published_at, title) VALUES (?, ?, ?)
+            ON CONFLICT(video_id) DO UPDATE SET published_at = excluded.published_at, title = excluded.title
+        """, rows)
+
+def get_stale_ids(conn, ttl_hours, target_year=None):
+    """IDs cuyas estadísticas no existen o son más antiguas que el TTL (solo del año pedido).
+
+    Van primero los que nunca se pidieron (los videos más nuevos antes) y luego los más
+    antiguos, para que un refresco limitado por la cuota empiece por lo que falta o es más viejo.
+    """
+    limit = time.time() - ttl_hours * 3600
+    query = "SELECT video_id FROM videos WHERE (stats_fetched_at IS NULL OR stats_fetched_at < ?)"
+    params = [limit]
+    if target_year is not None:
+        query += " AND substr(published_at, 1, 4) = ?"
+        params.append(str(target_year))
+    query += " ORDER BY stats_fetched_at, published_at DESC" # SQLite ordena los NULL primero
+    return [row[0] for row in conn.execute(query, params)]
+
+def save_statistics(conn, video_stats):
+    """Guarda las columnas obtenidas; los lotes con error se dejan para la próxima ejecución."""
+    now = time.time()
+    rows = []
+    for video_id, values in video_stats.items():
+        if all(value == "Error" for value in values):
+            continue
+        data = dict(zip(EXPORT_COLUMNS, values))
+        rows.append((data.get('Likes'), json.dumps(data, ensure_ascii=False), now, video_id))
+    with conn:
+        conn.executemany(
+            "UPDATE videos SET likes = ?, video_data = ?, stats_fetched_at = ? WHERE video_id = ?", rows
+        )
+
+def load_snapshot_videos(conn):
+    """Devuelve todos los videos de la instantánea como registros, del más nuevo al más antiguo.
+
+    Sus 'values' son las columnas guardadas, o None si nunca se pidieron.
+    """
+    return [
+        VideoRecord(video_id, published_at, title,
+                    values=values_from_data(json.loads(video_data)) if video_data else None)
+        for video_id, published_at, title, video_data in conn.execute(
+            "SELECT video_id, published_at, title, video_data FROM videos ORDER BY published_at DESC"
+        )
+    ]
+
+def crawl_playlist_into_snapshot(conn, youtube, playlist_id):
+    """Recorrido completo de la playlist que guarda cada página en la instantánea según llega.
+
+    Tras cada página se anota su pageToken siguiente junto a 'contiguous_until', así que si
+    la ejecución se corta (cuota, error, Ctrl+C) la siguiente continúa desde ahí en vez de
+    volver a la página 1. Al terminar el recorrido se borra. Devuelve (registros, motivo de
+    parada, True si se continuó un recorrido interrumpido).
+    """
+    resume_token = get_resume_page_token(conn, playlist_id)
+    if resume_token:
+        print(f"Se continúa el recorrido completo interrumpido desde pageToken={resume_token!r}.")
+    state = {}
+    records = []
+    for page in iter_playlist_pages(youtube, playlist_id, target_year=TARGET_YEAR, state=state,
+                                    page_token=resume_token):
+        if not records and not resume_token:
+            # Hasta que termine, entre las páginas guardadas y los videos anteriores puede haber
+            # un hueco: la instantánea deja de considerarse contigua
+            set_contiguous_until(conn, None)
+        page_records = [VideoRecord.from_playlist_item(item) for item in page]
+        save_playlist_items(conn, page_records)
+        set_resume_page_token(conn, playlist_id, state['next_page_token'])
+        records.extend(page_records)
+    print(f"Total de videos recuperados de la playlist: {len(records)}")
+    return records, state['stop_reason'], bool(resume_token)
+
+def sync_snapshot_playlist(conn, youtube, playlist_id, known_ids=None, full_resync=FULL_RESYNC):
+    """Recorre la playlist hasta el primer video ya guardado y guarda los nuevos en la instantánea.
+
+    Si la instantánea tiene huecos en el rango pedido (o 'full_resync'), la recorre entera
+    (crawl_playlist_into_snapshot: se guarda página a página y, si se corta, la siguiente
+    ejecución continúa donde se quedó).
+    'known_ids' evita releer los IDs de la instantánea si quien llama ya los tiene en memoria.
+    Devuelve (registros nuevos, motivo de parada, completa); si la paginación incremental no
+    terminó (error o cuota) los nuevos no se guardan.
+    """
+    # Solo se puede parar en un video conocido si la instantánea no tiene huecos en el rango pedido
+    contiguous_until = get_contiguous_until(conn)
+    use_snapshot = not full_resync and snapshot_covers(contiguous_until, TARGET_YEAR)
+    if not use_snapshot:
+        print(f"Instantánea '{SNAPSHOT_DB_FILE}': se recorre la playlist completa.")
+        new_records, stop_reason, resumed = crawl_playlist_into_snapshot(conn, youtube, playlist_id)
+        if stop_reason in (STOP_ERROR, STOP_QUOTA):
+            print("Advertencia: la paginación no terminó; las páginas recorridas quedan en la instantánea "
+                  "y la siguiente ejecución continúa desde la siguiente.")
+            return new_records, stop_reason, False
+        set_resume_page_token(conn, playlist_id, None)
+        if stop_reason == STOP_END:
+            set_contiguous_until(conn, "")
+        elif stop_reason == STOP_YEAR:
+            set_contiguous_until(conn, f"{TARGET_YEAR:04d}-01-01")
+        if resumed:
+            # Los videos publicados desde que empezó el recorrido quedan por encima de su primera página
+            head_records, _, complete = sync_snapshot_playlist(conn, youtube, playlist_id, full_resync=False)
+            return head_records + new_records, stop_reason, complete
+        return new_records, stop_reason, True
+
+    if known_ids is None:
+        known_ids = load_known_ids(conn)
+    print(f"Instantánea '{SNAPSHOT_DB_FILE}': {len(known_ids)} videos ya conocidos.")
+
+    new_records, stop_reason = get_all_videos_from_playlist(youtube, playlist_id, known_ids, TARGET_YEAR)
+    complete = stop_reason not in (STOP_ERROR, STOP_QUOTA)
+    if complete:
+        save_playlist_items(conn, new_records)
+        if stop_reason == STOP_END:
+            set_contiguous_until(conn, "")
+    else:
+        # Guardar una paginación incompleta dejaría un hueco que las siguientes ejecuciones no verían
+        print("Advertencia: la paginación no terminó; los videos nuevos no se guardan en la instantánea.")
+    return new_records, stop_reason, complete
+
+def select_export_records(records):
+    """Filtra los registros por TARGET_YEAR y DATE_RANGE. Devuelve (seleccionados, VideoTable o None).
+
+    Con NumPy el filtro es vectorizado y la tabla sirve para el ranking; sin él, se filtra uno a
+    uno. Los dos caminos seleccionan los mismos registros, en el mismo orden.
+    """
+    if numpy_available():
+        table = VideoTable.from_records(records, EXPORT_COLUMNS, int_columns())
+        sin_fecha = table.count_undated()
+        table = table.filter(TARGET_YEAR, *DATE_RANGE)
+        selected = table.records
+    else:
+        table = None
+        selected, sin_fecha = filter_records_by_date(records, TARGET_YEAR, DATE_RANGE)
+    if sin_fecha:
+        print(f"Advertencia: {sin_fecha} videos sin fecha válida. Se omiten.")
+    return selected, table
+
+def write_outputs_atomically(output_files, records):
+    """Escribe los registros en archivos temporales y los renombra sobre los definitivos.
+
+    Quien lea la salida mientras tanto ve la versión anterior completa, nunca una a medias.
+    Devuelve el número de filas escritas.
+    """
+    tmp_files = {file_format: filename + ".tmp" for file_format, filename in output_files.items()}
+    try:
+        count, _ = write_rows_streaming(tmp_files, iter_row_batches(records), find_most_liked=False)
+    except BaseException:
+        for tmp_filename in tmp_files.values():
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+        raise
+    for file_format, tmp_filename in tmp_files.items():
+        os.replace(tmp_filename, output_files[file_format])
+    return count
+
+class ChannelWatcher:
+    """Modo vigilancia: mantiene la exportación de un canal al día sin volver a arrancar el script.
+
+    Conserva el servicio autenticado y un índice en memoria de los videos del canal,
+    respaldado por la instantánea SQLite (al reiniciar se continúa donde se quedó). En cada
+    ciclo consulta solo la cabeza de la playlist, refresca las estadísticas caducadas más
+    antiguas con la parte de la cuota diaria que le toca a ese ciclo y reescribe la salida
+    solo si algo cambió. Como en la sincronización incremental, no detecta videos borrados
+    ni títulos editados de videos ya conocidos (FULL_RESYNC en una ejecución normal).
+
+    Lo gastado de 'daily_quota' se guarda en el contador de cuota, así que un reinicio no
+    vuelve a empezar el reparto del día. El recorrido completo de la playlist mientras la
+    instantánea no cubre el rango pedido no cuenta contra ese presupuesto (solo contra la
+    cuota del proyecto); si la cuota lo corta, continúa en el siguiente ciclo.
+    """
+
+    def __init__(self, youtube, credentials, playlist_id, ledger, output_files,
+                 poll_seconds=WATCH_POLL_MINUTES * 60, daily_quota=WATCH_DAILY_QUOTA):
+        self.youtube = youtube
+        self.credentials = credentials
+        self.playlist_id = playlist_id
+        self.ledger = ledger
+        self.output_files = output_files
+        self.poll_seconds = poll_seconds
+        self.daily_quota = daily_quota
+        self.conn = open_snapshot(SNAPSHOT_DB_FILE)
+        sync_export_columns(self.conn)
+        # Del más nuevo al más antiguo, con las columnas ya completas
+        self.records = build_snapshot_records(load_snapshot_videos(self.conn), {})
+        self.by_id = {record.video_id: record for record in self.records}
+        self.written = False
+
+    def spent_today(self):
+        """Unidades de 'daily_quota' gastadas hoy, según el contador de cuota (sobrevive a reinicios)."""
+        return self.ledger.share_spent_today(WATCH_QUOTA_SHARE)
+
+    def cycle_budget(self):
+        """Unidades para las estadísticas de este ciclo.
+
+        Es lo que queda hoy de 'daily_quota' repartido entre los ciclos que faltan hasta que la
+        API reinicie la cuota, así que lo que un ciclo no gasta pasa a los siguientes.
+        """
+        cycles_left = max(1, math.ceil(self.ledger.seconds_until_reset() / self.poll_seconds))
+        budget = (self.daily_quota - self.spent_today()) // cycles_left
+        return max(0, min(budget, self.ledger.remaining()))
+
+    def needs_full_crawl(self):
+        """Indica si la instantánea aún no cubre el rango pedido (el primer ciclo recorre la playlist entera)."""
+        return not snapshot_covers(get_contiguous_until(self.conn), TARGET_YEAR)
+
+    def poll_head(self):
+        """Añade al índice los videos nuevos de la cabeza de la playlist. Devuelve cuántos."""
+        full_crawl = self.needs_full_crawl()
+        new_records, _, complete = sync_snapshot_playlist(self.conn, self.youtube, self.playlist_id,
+                                                          known_ids=self.by_id.keys(), full_resync=False)
+        if not complete:
+            return 0 # Se reintenta (o se continúa el recorrido completo) en el siguiente ciclo
+        if full_crawl:
+            # El recorrido completo pudo repartirse en varios ciclos: se recarga entero de la instantánea
+            known_count = len(self.records)
+            self.records = build_snapshot_records(load_snapshot_videos(self.conn), {})
+            self.by_id = {record.video_id: record for record in self.records}
+            return max(0, len(self.records) - known_count)
+        fresh = [record for record in new_records
+                 if record.video_id and record.published_at and record.video_id not in self.by_id]
+        if not fresh:
+            return 0
+        for record in fresh:
+            record.values = missing_video_data()
+            self.by_id[record.video_id] = record
+        self.records.extend(fresh)
+        self.records.sort(key=lambda record: record.published_at, reverse=True)
+        return len(fresh)
+
+    def refresh_stats(self, budget_units):
+        """Refresca las estadísticas caducadas más antiguas que caben en 'budget_units'.
+
+        Devuelve (videos refrescados, videos cuyos valores cambiaron).
+        """
+        batches = budget_units // quota_cost("youtube.videos.list")
+        stale_ids = get_stale_ids(self.conn, STATS_TTL_HOURS, TARGET_YEAR)[:batches * STATS_BATCH_SIZE]
+        if not stale_ids:
+            return 0, 0
+        video_stats = get_video_statistics(self.youtube, stale_ids, self.credentials)
+        save_statistics(self.conn, video_stats)
+        changed = 0
+        for video_id, values in video_stats.items():
+            record = self.by_id.get(video_id)
+            # Si el lote falló se conservan los valores anteriores
+            if record is None or all(value == "Error" for value in values) or record.values == values:
+                continue
+            record.values = values
+            changed += 1
+        return len(video_stats), changed
+
+    def run_cycle(self):
+        """Un ciclo: cabeza de la playlist, estadísticas y, si algo cambió, la salida."""
+        budget = self.cycle_budget()
+        spent_before = self.ledger.spent_today()
+        if self.ledger.remaining() <= 0:
+            print(f"[{time.strftime('%H:%M:%S')}] Sin cuota hoy: se espera al siguiente ciclo.")
+            return
+        # El recorrido completo inicial (instantánea vacía o incompleta) no cuenta contra
+        # 'daily_quota': si contara, superaría el presupuesto del ciclo y no se pedirían estadísticas
+        bootstrap = self.needs_full_crawl()
+        # La cabeza se consulta siempre (1 unidad por página): es lo que detecta los videos nuevos
+        new_count = self.poll_head()
+        head_spent = max(0, self.ledger.spent_today() - spent_before)
+        stats_budget = budget if bootstrap else budget - head_spent
+        refreshed, changed = self.refresh_stats(stats_budget) if stats_budget > 0 else (0, 0)
+        spent = max(0, self.ledger.spent_today() - spent_before)
+        self.ledger.charge_share(WATCH_QUOTA_SHARE, spent - head_spent if bootstrap else spent)
+
+        rewritten = False
+        if new_count or changed or not self.written:
+            selected, _ = select_export_records(self.records)
+            write_outputs_atomically(self.output_files, selected)
+            self.written = rewritten = True
+        print(f"[{time.strftime('%H:%M:%S')}] {new_count} videos nuevos, {refreshed} estadísticas refrescadas "
+              f"({changed} con cambios), {spent} unidades (hoy: {self.spent_today()} de {self.daily_quota}); "
+              + ("salida reescrita." if rewritten else "la salida no cambia."))
+
+    def run(self, max_cycles=None, credentials_manager=None):
+        """Repite run_cycle cada 'poll_seconds' hasta Ctrl+C (o 'max_cycles' ciclos).
+
+        Si el token deja de poder renovarse (RefreshError, también el que detecta
+        'credentials_manager') se lanza el error: ningún ciclo posterior podría funcionar.
+        """
+        output_names = ", ".join(f"'{filename}'" for filename in self.output_files.values())
+        print(f"\nModo vigilancia: {len(self.records)} videos en memoria; se comprueba cada "
+              f"{self.poll_seconds / 60:g} minutos y se mantienen al día {output_names}. Ctrl+C para salir.")
+        cycles = 0
+        try:
+            while True:
+                cycle_start = time.monotonic()
+                if credentials_manager:
+                    credentials_manager.check()
+                try:
+                    self.run_cycle()
+                except QuotaExceededError:
+                    print("Cuota diaria agotada durante el ciclo; se sigue en el siguiente.")
+                except RefreshError:
+                    raise
+                except Exception as e:
+                    # Un error puntual (red, disco...) no debe parar un proceso que corre días
+                    print(f"Error inesperado en el ciclo de vigilancia: {e}. Se reintenta en el siguiente.")
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+                time.sleep(max(0.0, self.poll_seconds - (time.monotonic() - cycle_start)))
+        except KeyboardInterrupt:
+            print("\nModo vigilancia detenido.")
+        finally:
+            self.conn.close()
+
 def main():
     """Función principal del script."""
+    # Contabilizar la cuota de todas las llamadas en el contador diario compartido
+    try:
+        check_output_formats(OUTPUT_FORMATS)
+    except (ValueError, ImportError) as e:
+        print(f"Error en OUTPUT_FORMATS: {e}")
+        return
+
+    ledger = enable_quota_ledger()
+    trace = enable_tracing(TRACE_FILE)
+    # La caché tiene que estar activa antes de construir el servicio
+    cache = enable_response_cache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB) if HTTP_CACHE_DIR else None
+    ledger.report()
+    if ledger.remaining() <= 0:
+        print("No queda cuota diaria de la API (según el contador compartido). Saliendo.")
+        return
+
+    if MULTI_CHANNEL_SOURCES and WATCH_MODE:
+        print("El modo vigilancia (WATCH_MODE) no admite MULTI_CHANNEL_SOURCES. Saliendo.")
+        return
+    if MULTI_CHANNEL_SOURCES:
+        export_multi_channel(MULTI_CHANNEL_SOURCES, trace, cache)
+        trace.report(METRICS_FILE)
+        if cache:
+            cache.stats.report()
+        ledger.report()
+        print("\n--- Proceso Finalizado ---")
+        return
+
     youtube = get_authenticated_service()
     if not youtube:
         print("No se pudo inicializar el servicio de YouTube. Saliendo.")
         return
+    credentials = get_credentials(TOKEN_PICKLE_FILE, SCOPES)
 
     uploads_playlist_id = get_channel_uploads_playlist_id(youtube)
     if not uploads_playlist_id:
         print("No se pudo obtener el ID de la playlist de subidas. Saliendo.")
         return
 
-    all_videos_items = get_all_videos_from_playlist(youtube, uploads_playlist_id)
+    output_files = get_output_files(TARGET_YEAR)
+    if WATCH_MODE:
+        watcher = ChannelWatcher(youtube, credentials, uploads_playlist_id, ledger, output_files)
+        # El token se renueva en segundo plano: el proceso vive mucho más que su hora de validez
+        try:
+            with CredentialsManager(credentials, TOKEN_PICKLE_FILE) as credentials_manager:
+                watcher.run(credentials_manager=credentials_manager)
+        except RefreshError as e:
+            print(f"\nModo vigilancia detenido: el token '{TOKEN_PICKLE_FILE}' ya no se puede renovar ({e}). "
+                  "Bórralo y vuelve a ejecutar el script para autorizarlo de nuevo.")
+        trace.report(METRICS_FILE)
+        if cache:
+            cache.stats.report()
+        ledger.report()
+        print("\n--- Proceso Finalizado ---")
+        return
 
-    if not all_videos_items:
-        print("No se encontraron videos en la playlist de subidas o hubo un error al recuperarlos.")
+    if STREAMING_MODE:
+        export_streaming(youtube, uploads_playlist_id, output_files, TARGET_YEAR, credentials)
+        trace.report(METRICS_FILE)
+        if cache:
+            cache.stats.report()
+        ledger.report()
+        print("\n--- Proceso Finalizado ---")
         return
 
-    # --- Obtener Estadísticas (Likes) ---
-    all_video_ids = []
-    for item in all_videos_items:
-        video_id = item.get("snippet", {}).get("resourceId", {}).get("videoId")
-        if video_id:
-            all_video_ids.append(video_id)
+    # --- Sincronización incremental con la instantánea local ---
+    conn = open_snapshot(SNAPSHOT_DB_FILE)
+    sync_export_columns(conn)
+    new_items, stop_reason, complete = sync_snapshot_playlist(conn, youtube, uploads_playlist_id)
+    if complete:
+        new_items = None # Ya están en la instantánea, que se vuelve a cargar entera más abajo
 
+    # --- Obtener las columnas (likes, vistas...) solo de los videos caducados ---
+    stale_ids = get_stale_ids(conn, STATS_TTL_HOURS, TARGET_YEAR)
     video_stats = {}
-    if all_video_ids:
-        video_stats = get_video_statistics(youtube, all_video_ids)
+    # Pedir solo los lotes de estadísticas que caben en la cuota restante; el resto sigue caducado
+    affordable_batches = ledger.affordable(quota_cost("youtube.videos.list"), math.ceil(len(stale_ids) / STATS_BATCH_SIZE))
+    if affordable_batches * STATS_BATCH_SIZE < len(stale_ids):
+        print(f"\nLa cuota restante solo alcanza para {affordable_batches} lotes de estadísticas: "
+              f"se refrescan {min(len(stale_ids), affordable_batches * STATS_BATCH_SIZE)} de {len(stale_ids)} videos.")
+        stale_ids = stale_ids[:affordable_batches * STATS_BATCH_SIZE]
+    if stop_reason == STOP_QUOTA:
+        print("\nSin cuota disponible: se exporta lo que ya hay en la instantánea, sin pedir estadísticas.")
+    elif stale_ids:
+        video_stats = get_video_statistics(youtube, stale_ids, credentials)
+        save_statistics(conn, video_stats)
     else:
-        print("No se encontraron IDs de vídeo válidos para obtener estadísticas.")
+        print(f"\nTodas las estadísticas tienen menos de {STATS_TTL_HOURS} horas. No se piden a la API.")
+
+    snapshot_videos = load_snapshot_videos(conn)
+    conn.close()
+    if not complete:
+        # Incluir en esta ejecución los videos nuevos aunque no se hayan guardado
+        snapshot_ids = {record.video_id for record in snapshot_videos}
+        extra_records = [record for record in new_items if record.video_id not in snapshot_ids]
+        snapshot_videos = extra_records + snapshot_videos
+
+    if not snapshot_videos:
+        print("No se encontraron videos en la playlist de subidas o hubo un error al recuperarlos.")
+        return
     # ------------------------------------
 
-    # Determinar el nombre del archivo de salida basado en TARGET_YEAR
     if TARGET_YEAR is None:
-        output_filename = "videos_youtube_all_years.csv"
         print("\nProcesando videos de TODOS los años.")
     else:
-        output_filename = f"videos_youtube_{TARGET_YEAR}.csv"
         print(f"\nFiltrando videos publicados en el año {TARGET_YEAR}...")
 
-    # Filtrar videos (si TARGET_YEAR tiene un valor) y añadir likes
-    videos_seleccionados = []
+    # Añadir las columnas elegidas y filtrar videos (si TARGET_YEAR o DATE_RANGE tienen valor)
     print("Procesando y filtrando vídeos...")
-    for item in all_videos_items:
-        snippet = item.get("snippet", {})
-        published_at_str = snippet.get("publishedAt")
-        title = snippet.get("title", "Sin Título")
-        video_id = snippet.get("resourceId", {}).get("videoId")
-
-        if not published_at_str or not video_id:
-            print(f"Advertencia: Video '{title}' (Item ID: {item.get('id')}) sin fecha o ID. Saltando.")
-            continue
-
-        try:
-            published_date = datetime.fromisoformat(published_at_str.replace('Z', '+00:00'))
-
-            # Aplicar el filtro de año SOLO si TARGET_YEAR no es None
-            if TARGET_YEAR is None or published_date.year == TARGET_YEAR:
-                # Obtener los likes del diccionario de estadísticas
-                likes = video_stats.get(video_id, "N/A") # Valor por defecto si no se encontró
-
-                videos_seleccionados.append({
-                    'Título del video': title,
-                    'ID de youtube': video_id,
-                    'Likes': likes # Añadir la nueva columna
-                })
-
-        except ValueError:
-            print(f"Advertencia: Formato de fecha inesperado '{published_at_str}' para video '{title}'. Saltando.")
-        except Exception as e:
-            print(f"Error procesando fecha del video '{title}': {e}")
+    records = build_snapshot_records(snapshot_videos, video_stats)
+    videos_seleccionados, table = select_export_records(records)
 
     # Escribir el archivo CSV
     if videos_seleccionados:
         print(f"\nSe encontraron {len(videos_seleccionados)} videos para incluir en el CSV.")
-        print(f"Escribiendo resultados en '{output_filename}'...")
+        output_names = ", ".join(f"'{filename}'" for filename in output_files.values())
+        print(f"Escribiendo resultados en {output_names}...")
         try:
-            with open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                # Actualizar los nombres de campo para incluir 'Likes'
-                fieldnames = ['Título del video', 'ID de youtube', 'Likes']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(videos_seleccionados)
-            print(f"Archivo CSV '{output_filename}' creado con éxito.")
-
-            # --- Encontrar el video con más likes ---
-            video_mas_likes = None
-            max_likes = -1
-
-            for video in videos_seleccionados:
-                try:
-                    # Intentar convertir likes a entero, ignorar si no es posible
-                    likes_actual = int(video['Likes'])
-                    if likes_actual > max_likes:
-                        max_likes = likes_actual
-                        video_mas_likes = video
-                except (ValueError, TypeError):
-                    # Ignorar videos donde 'Likes' no sea un número válido (N/A, Error, etc.)
-                    continue
-
-            if video_mas_likes:
-                titulo = video_mas_likes['Título del video']
-                video_id = video_mas_likes['ID de youtube']
-                likes_num = video_mas_likes['Likes'] # Mostrar el valor original (puede ser string)
-                link = f"https://www.youtube.com/watch?v={video_id}"
-                print("\n--- Vídeo con más likes ---")
-                print(f"Título: {titulo}")
-                print(f"ID: {video_id}")
-                print(f"Likes: {likes_num}")
-                print(f"Enlace: {link}")
-            else:
-                print("\nNo se encontraron vídeos con un número de likes válido para determinar el máximo.")
-            # ------------------------------------
+            # Mismos escritores que el modo streaming; con la tabla, el ranking es vectorizado
+            write_rows_streaming(output_files, iter_row_batches(videos_seleccionados), find_most_liked=False)
+            print(f"Archivos {output_names} creados con éxito.")
+            print_table_summary(videos_seleccionados, table)
 
         except IOError as e:
-            print(f"Error al escribir el archivo CSV '{output_filename}': {e}")
+            print(f"Error al escribir los archivos de salida {output_names}: {e}")
         except Exception as e:
-             print(f"Error inesperado al escribir el CSV: {e}")
+             print(f"Error inesperado al escribir la salida: {e}")
     else:
         if TARGET_YEAR is None:
             print("No se encontraron videos en total para generar el archivo CSV.")
         else:
             print(f"No se encontraron videos del año {TARGET_YEAR} para generar el archivo CSV.")
 
+    trace.report(METRICS_FILE)
+    if cache:
+        cache.stats.report()
+    ledger.report()
     print("\n--- Proceso Finalizado ---")
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+"""Las columnas exportadas por generar_csv_videos.py se leen de EXPORT_COLUMNS en cada llamada."""
+import csv
+import os
+import tempfile
+import unittest
+
+import generar_csv_videos as generar
+from youtube_core import VideoRecord
+
+
+class ExportColumnsOverrideTest(unittest.TestCase):
+    """Cambiar EXPORT_COLUMNS tras importar el módulo afecta a la salida sin volver a importarlo."""
+
+    def setUp(self):
+        self.original_columns = generar.EXPORT_COLUMNS
+        generar.EXPORT_COLUMNS = ['Likes', 'Vistas']
+
+    def tearDown(self):
+        generar.EXPORT_COLUMNS = self.original_columns
+
+    def test_helpers_follow_override(self):
+        self.assertEqual(generar.csv_fieldnames(), ['Título del video', 'ID de youtube', 'Likes', 'Vistas'])
+        self.assertEqual(generar.int_columns(), {'Likes', 'Vistas'})
+        self.assertEqual(generar.get_video_fields(), "items(id,statistics(likeCount,viewCount))")
+        self.assertEqual(generar.missing_video_data(), ("N/A", "N/A"))
+
+    def test_stream_row_with_overridden_columns(self):
+        record = VideoRecord("abcdefghijk", "2025-03-01T10:00:00Z", "Un video", values=(12, 345))
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "videos.csv")
+            count, most_liked = generar.write_rows_streaming({'csv': filename}, generar.iter_row_batches([record]))
+            with open(filename, newline='', encoding='utf-8') as csvfile:
+                rows = list(csv.DictReader(csvfile))
+        self.assertEqual(count, 1)
+        self.assertEqual(most_liked['ID de youtube'], "abcdefghijk")
+        self.assertEqual(rows, [{'Título del video': "Un video", 'ID de youtube': "abcdefghijk",
+                                 'Likes': "12", 'Vistas': "345"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+"""Código compartido por los scripts de YouTube (generar, actualizar y ocultar likes)."""
+from youtube_core.retry import (
+    QuotaExceededError,
+    execute_with_retry,
+    get_error_reason,
+    is_quota_error,
+    is_retryable,
+)
+from youtube_core.auth import get_authenticated_service, get_credentials, get_thread_http
+from youtube_core.credentials import CredentialsManager, save_credentials
+from youtube_core.csv_input import VideoCsv, normalize_video_id
+from youtube_core.http_cache import enable_response_cache, get_response_cache
+from youtube_core.quota import QuotaLedger, enable_quota_ledger, get_quota_ledger, quota_cost
+from youtube_core.tracing import RunTrace, enable_tracing, get_trace
+from youtube_core.video_record import VideoRecord, compact_value
+from youtube_core.video_table import VideoTable, numpy_available
+from youtube_core.writers import OUTPUT_EXTENSIONS, check_output_formats, open_writer
@@ -0,0 +1,162 @@
+"""Credenciales OAuth 2.0 y servicio de la YouTube Data API, compartidos por todos los scripts.
+
+El servicio se construye una sola vez por proceso (y por token/scopes) a partir del
+documento de descubrimiento estático que incluye googleapiclient, así que arrancar no
+necesita ninguna llamada de red. También es el único sitio donde se crean los transportes
+HTTP, para poder añadir aquí la gestión de conexiones.
+
+Con la variable de entorno YOUTUBE_API_ENDPOINT (p. ej. "http://127.0.0.1:8765/") todas las
+llamadas, incluidas las peticiones por lotes, van a ese servidor con credenciales anónimas y
+sin flujo OAuth: es lo que usan las pruebas de rendimiento de 'benchmarks/'.
+"""
+import json
+import os
+import pickle
+import sys
+import threading
+
+import google_auth_httplib2
+from google.auth.credentials import AnonymousCredentials
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+
+from youtube_core.credentials import save_credentials
+from youtube_core.http_cache import new_http
+
+CLIENT_SECRETS_FILE = "client_secret.json" # Archivo de credenciales descargado de Google Cloud
+API_SERVICE_NAME = "youtube"
+API_VERSION = "v3"
+# Servidor alternativo de la API (p. ej. el servidor falso de 'benchmarks/'); vacío = API real
+API_ENDPOINT_ENV = "YOUTUBE_API_ENDPOINT"
+
+# Caché del proceso: (token_file, scopes) -> credenciales / servicio ya construidos
+_credentials_cache = {}
+_service_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _run_authorization_flow(client_secrets_file, scopes):
+    if not os.path.exists(client_secrets_file):
+        print(f"Error Crítico: No se encuentra el archivo '{client_secrets_file}'.")
+        print("Asegúrate de haber descargado el archivo JSON de credenciales y guardado con ese nombre.")
+        sys.exit(1)
+
+    print(f"Se necesita autorización para la cuenta de YouTube ({', '.join(scopes)}).")
+    print("Abriendo navegador...")
+    flow = InstalledAppFlow.from_client_secrets_file(client_secrets_file, scopes)
+    return flow.run_local_server(port=0)
+
+
+def _load_credentials(token_file, scopes, client_secrets_file):
+    credentials = None
+    if os.path.exists(token_file):
+        with open(token_file, 'rb') as token:
+            try:
+                credentials = pickle.load(token)
+            except (pickle.UnpicklingError, EOFError):
+                print(f"Advertencia: No se pudo leer {token_file}. Se solicitará autorización.")
+                credentials = None
+
+    if not credentials or not credentials.valid:
+        if credentials and credentials.expired and credentials.refresh_token:
+            print("Refrescando token de acceso...")
+            try:
+                credentials.refresh(Request())
+            except Exception as e:
+                print(f"Error al refrescar el token ({type(e).__name__}): {e}. Se requiere nueva autorización.")
+                if os.path.exists(token_file):
+                    try:
+                        os.remove(token_file)
+                        print(f"Archivo de token '{token_file}' eliminado.")
+                    except OSError as oe:
+                        print(f"Error eliminando el archivo de token: {oe}")
+                credentials = _run_authorization_flow(client_secrets_file, scopes)
+        else:
+            credentials = _run_authorization_flow(client_secrets_file, scopes)
+
+        save_credentials(credentials, token_file)
+        print(f"Credenciales guardadas en '{token_file}' para futuras ejecuciones.")
+    return credentials
+
+
+def get_api_endpoint():
+    """Servidor alternativo configurado en YOUTUBE_API_ENDPOINT, o None para la API real."""
+    endpoint = os.environ.get(API_ENDPOINT_ENV, "").strip()
+    if not endpoint:
+        return None
+    return endpoint if endpoint.endswith("/") else endpoint + "/"
+
+
+def get_credentials(token_file, scopes, client_secrets_file=CLIENT_SECRETS_FILE):
+    """Devuelve las credenciales del token indicado, cargadas (y refrescadas) una vez por proceso."""
+    key = (token_file, tuple(scopes))
+    with _cache_lock:
+        if key not in _credentials_cache:
+            if get_api_endpoint():
+                # El servidor alternativo no comprueba la autorización
+                _credentials_cache[key] = AnonymousCredentials()
+            else:
+                _credentials_cache[key] = _load_credentials(token_file, scopes, client_secrets_file)
+        return _credentials_cache[key]
+
+
+def _build_service(credentials):
+    # Transporte propio (en vez de credentials=) para que use la caché de respuestas si está activa
+    http = google_auth_httplib2.AuthorizedHttp(credentials, http=new_http())
+    endpoint = get_api_endpoint()
+    if endpoint is None:
+        # static_discovery: usa el documento de descubrimiento incluido en googleapiclient
+        return build(API_SERVICE_NAME, API_VERSION, http=http,
+                     static_discovery=True, cache_discovery=False)
+    # Se cambia la raíz en el propio documento para que también las peticiones por lotes
+    # (new_batch_http_request) vayan al servidor alternativo
+    document = json.loads(get_static_doc(API_SERVICE_NAME, API_VERSION))
+    document["rootUrl"] = endpoint
+    document["mtlsRootUrl"] = endpoint
+    return build_from_document(document, http=http)
+
+
+def get_authenticated_service(token_file, scopes, client_secrets_file=CLIENT_SECRETS_FILE):
+    """Devuelve el servicio API autenticado (construido una vez por proceso), o None si falla."""
+    key = (token_file, tuple(scopes))
+    if key in _service_cache:
+        return _service_cache[key]
+
+    credentials = get_credentials(token_file, scopes, client_secrets_file)
+    try:
+        youtube_service = _build_service(credentials)
+        print("Servicio de YouTube autenticado correctamente.")
+    except HttpError as e:
+        print(f"Error construyendo el servicio API: {e.resp.status} {e.content}")
+        if os.path.exists(token_file):
+            print(f"Intenta eliminar el archivo '{token_file}' y ejecutar el script de nuevo.")
+        return None
+    except Exception as e:
+        print(f"Error inesperado construyendo el servicio: {e}")
+        return None
+
+    with _cache_lock:
+        _service_cache[key] = youtube_service
+    return youtube_service
+
+
+# httplib2.Http no es seguro entre hilos: cada hilo usa su propio transporte autorizado
+_thread_local = threading.local()
+
+
+def get_thread_http(credentials):
+    """Devuelve el transporte HTTP autorizado del hilo actual para esas credenciales.
+
+    Se crea la primera vez que el hilo lo pide y se reutiliza después (mantiene la conexión).
+    """
+    transports = getattr(_thread_local, 'transports', None)
+    if transports is None:
+        transports = _thread_local.transports = {}
+    http = transports.get(id(credentials))
+    if http is None:
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=new_http())
+        transports[id(credentials)] = http
+    return http
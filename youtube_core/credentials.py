@@ -0,0 +1,155 @@
+"""Refresco proactivo de las credenciales OAuth para ejecuciones largas.
+
+CredentialsManager renueva el token en segundo plano antes de que caduque, así que
+ninguna petición de los hilos de trabajo llega a fallar por token expirado. Todos los
+hilos comparten el mismo objeto de credenciales: leerlo no necesita bloqueo, solo el
+refresco (que es poco frecuente) se serializa. Cada token renovado se guarda en el
+archivo pickle de forma atómica. Si un refresco falla por un error transitorio se reintenta
+con espera exponencial; si Google rechaza el refresh token (RefreshError: revocado o
+caducado) el hilo se detiene y el error se entrega a quien use el gestor (check()).
+
+El reloj y la petición HTTP del refresco son inyectables para poder probarlo con un
+reloj falso y un endpoint de tokens falso.
+"""
+import calendar
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+
+# Renovar cuando queden menos de estos segundos (google-auth refresca solo con < 3m45s)
+REFRESH_MARGIN_SECONDS = 600
+# Intervalo máximo entre comprobaciones del hilo de refresco
+CHECK_INTERVAL_SECONDS = 60
+# Espera tras un refresco fallido por un error transitorio: se duplica en cada fallo seguido
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+
+
+def save_credentials(credentials, token_file):
+    """Guarda las credenciales en 'token_file' de forma atómica (archivo temporal + rename)."""
+    directory = os.path.dirname(os.path.abspath(token_file))
+    fd, tmp_path = tempfile.mkstemp(prefix=".token-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            pickle.dump(credentials, tmp)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, token_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CredentialsManager:
+    """Mantiene frescas unas credenciales compartidas por cualquier número de hilos."""
+
+    def __init__(self, credentials, token_file=None, refresh_margin=REFRESH_MARGIN_SECONDS,
+                 clock=time.time, request_factory=Request, check_interval=CHECK_INTERVAL_SECONDS):
+        self.credentials = credentials
+        self.token_file = token_file
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self._clock = clock
+        self._request_factory = request_factory
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.failures = 0 # Refrescos fallidos seguidos (errores transitorios)
+        self.error = None # RefreshError definitivo: el token ya no se puede renovar
+
+    def seconds_until_expiry(self):
+        """Segundos hasta que caduque el token (None si no tiene caducidad)."""
+        expiry = self.credentials.expiry # datetime UTC sin zona horaria
+        if expiry is None:
+            return None
+        return calendar.timegm(expiry.utctimetuple()) - self._clock()
+
+    def needs_refresh(self):
+        remaining = self.seconds_until_expiry()
+        return remaining is not None and remaining <= self.refresh_margin
+
+    def refresh(self):
+        """Renueva el token ya (solo un hilo a la vez) y lo guarda en token_file."""
+        with self._refresh_lock:
+            # Otro hilo pudo renovarlo mientras se esperaba el bloqueo
+            if not self.needs_refresh() and self.credentials.token:
+                return False
+            self.credentials.refresh(self._request_factory())
+            if self.token_file:
+                save_credentials(self.credentials, self.token_file)
+            return True
+
+    def maybe_refresh(self):
+        """Renueva el token si está dentro del margen. Devuelve True si se renovó.
+
+        Lanza RefreshError si Google rechaza el refresh token: reintentar no serviría.
+        """
+        self.check()
+        if not self.needs_refresh():
+            return False
+        try:
+            refreshed = self.refresh()
+        except RefreshError as e:
+            self.error = e
+            print(f"Error: el token de acceso no se puede renovar ({e}). Vuelve a autorizar el script.")
+            raise
+        except Exception as e:
+            # Se reintenta con espera exponencial; google-auth aún puede refrescar en línea
+            self.failures += 1
+            print(f"Advertencia: no se pudo refrescar el token de acceso ({type(e).__name__}): {e}. "
+                  f"Nuevo intento en {self._retry_delay():.0f} s.")
+            return False
+        self.failures = 0
+        return refreshed
+
+    def check(self):
+        """Lanza el RefreshError definitivo, si lo hubo (el hilo de refresco ya se detuvo)."""
+        if self.error is not None:
+            raise self.error
+
+    def _retry_delay(self):
+        return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (self.failures - 1))
+
+    def _next_wait(self):
+        if self.failures:
+            return self._retry_delay()
+        remaining = self.seconds_until_expiry()
+        if remaining is None:
+            return self.check_interval
+        return max(1.0, min(self.check_interval, remaining - self.refresh_margin))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.maybe_refresh()
+            except RefreshError:
+                return # Definitivo: quien use el gestor lo recibe en check() o al salir del 'with'
+            self._stop.wait(self._next_wait())
+
+    def start(self):
+        """Arranca el hilo de refresco en segundo plano (daemon)."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="credentials-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        if exc is None:
+            self.check()
@@ -0,0 +1,118 @@
+"""Lectura validada y en streaming de los CSV de entrada de los scripts que modifican videos.
+
+El CSV se recorre dos veces sin cargarlo entero en memoria:
+  1. scan(): valida y normaliza cada ID (11 caracteres [A-Za-z0-9_-], o una URL de YouTube)
+     y guarda solo un índice {ID: número de la última fila con ese ID}. Las filas con ID
+     inválido y los duplicados se cuentan para informar ANTES de gastar cuota.
+  2. iter_batches(): vuelve a leer el archivo y entrega, por lotes, solo la última fila de
+     cada ID válido (en el orden del archivo), del tamaño que usan las llamadas por lotes.
+"""
+import csv
+import re
+
+# Un ID de video de YouTube: 11 caracteres del alfabeto base64 para URLs
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+# IDs pegados como URL: watch?v=ID, youtu.be/ID, /shorts/ID, /embed/ID, /live/ID
+VIDEO_URL_PATTERN = re.compile(r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])")
+# Filas con problemas que se muestran una a una en el informe (el resto solo se cuentan)
+MAX_REPORTED_ROWS = 20
+
+
+def normalize_video_id(value):
+    """Devuelve el ID de 11 caracteres de 'value' (ID o URL, con espacios alrededor), o None si no es válido."""
+    value = (value or "").strip()
+    if VIDEO_ID_PATTERN.match(value):
+        return value
+    match = VIDEO_URL_PATTERN.search(value)
+    return match.group(1) if match else None
+
+
+class VideoCsv:
+    """CSV de entrada indexado por ID de video (ver el docstring del módulo)."""
+
+    def __init__(self, filename, id_column, required_columns=()):
+        self.filename = filename
+        self.id_column = id_column
+        self.required_columns = [id_column] + [column for column in required_columns if column != id_column]
+        self.fieldnames = None
+        self.total_rows = 0
+        self.last_row = {}    # {ID: número (desde 1) de la última fila de datos con ese ID}
+        self.invalid = []     # [(fila, valor)] de las primeras MAX_REPORTED_ROWS filas con ID inválido
+        self.invalid_count = 0
+        self.duplicates = {}  # {ID: filas anteriores que se descartan porque el ID se repite}
+        self.excluded = 0
+
+    def _open(self):
+        return open(self.filename, mode='r', encoding='utf-8', newline='')
+
+    def scan(self):
+        """Primera pasada: comprueba las columnas e indexa los IDs. Lanza ValueError si faltan columnas."""
+        with self._open() as csvfile:
+            reader = csv.DictReader(csvfile)
+            self.fieldnames = reader.fieldnames or []
+            missing = [column for column in self.required_columns if column not in self.fieldnames]
+            if missing:
+                raise ValueError(f"Faltan las columnas {missing}. Columnas encontradas: {self.fieldnames}")
+            for row_number, row in enumerate(reader, start=1):
+                self.total_rows = row_number
+                video_id = normalize_video_id(row.get(self.id_column))
+                if video_id is None:
+                    self.invalid_count += 1
+                    if len(self.invalid) < MAX_REPORTED_ROWS:
+                        self.invalid.append((row_number, row.get(self.id_column)))
+                    continue
+                if video_id in self.last_row:
+                    self.duplicates[video_id] = self.duplicates.get(video_id, 0) + 1
+                self.last_row[video_id] = row_number
+        return self
+
+    def __len__(self):
+        """Número de filas que se van a procesar (una por ID válido, sin las excluidas)."""
+        return len(self.last_row)
+
+    def ids(self):
+        return self.last_row.keys()
+
+    def exclude(self, video_ids):
+        """Quita del procesamiento los IDs indicados (p. ej. los ya terminados con --resume)."""
+        before = len(self.last_row)
+        for video_id in video_ids:
+            self.last_row.pop(video_id, None)
+        removed = before - len(self.last_row)
+        self.excluded += removed
+        return removed
+
+    def report(self):
+        """Imprime cuántas filas se leyeron, cuántas se descartan y por qué (antes de llamar a la API)."""
+        duplicate_rows = sum(self.duplicates.values())
+        print(f"Se leyeron {self.total_rows} filas del archivo '{self.filename}': "
+              f"{len(self.last_row) + self.excluded} IDs únicos válidos.")
+        if self.invalid_count:
+            print(f"Advertencia: {self.invalid_count} filas con '{self.id_column}' vacío o inválido se omiten:")
+            for row_number, value in self.invalid:
+                print(f"  - fila {row_number}: {value!r}")
+            if self.invalid_count > len(self.invalid):
+                print(f"  ... y {self.invalid_count - len(self.invalid)} más.")
+        if duplicate_rows:
+            print(f"Advertencia: {len(self.duplicates)} IDs repetidos ({duplicate_rows} filas de más); "
+                  "se usa la última fila de cada uno:")
+            for video_id, repeats in list(self.duplicates.items())[:MAX_REPORTED_ROWS]:
+                print(f"  - {video_id}: {repeats + 1} filas (se usa la fila {self.last_row.get(video_id, '-')})")
+            if len(self.duplicates) > MAX_REPORTED_ROWS:
+                print(f"  ... y {len(self.duplicates) - MAX_REPORTED_ROWS} IDs más.")
+
+    def iter_batches(self, batch_size):
+        """Segunda pasada: listas de hasta 'batch_size' filas (con el ID ya normalizado), en el orden del archivo."""
+        batch = []
+        with self._open() as csvfile:
+            for row_number, row in enumerate(csv.DictReader(csvfile), start=1):
+                video_id = normalize_video_id(row.get(self.id_column))
+                if video_id is None or self.last_row.get(video_id) != row_number:
+                    continue # ID inválido, fila repetida sustituida por una posterior, o excluido
+                row[self.id_column] = video_id
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
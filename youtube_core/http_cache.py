@@ -0,0 +1,199 @@
+"""Caché en disco de las respuestas de la API, revalidada con ETag / If-None-Match.
+
+httplib2 ya sabe usar una caché: guarda cada respuesta GET con su ETag y, como la API la
+marca con 'max-age=0, must-revalidate', la siguiente petición a la misma URL (mismos
+parámetros) se envía con 'If-None-Match'. Si el recurso no cambió, la API responde 304 sin
+cuerpo y httplib2 devuelve el guardado. Aquí se le da una caché en disco con tamaño máximo
+(se expulsan las entradas usadas hace más tiempo) y se cuentan aciertos, fallos,
+revalidaciones y bytes ahorrados. Ojo: un 304 ahorra transferencia, no cuota.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+import httplib2
+from googleapiclient.http import build_http
+
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_MAX_MB = 200
+# Al pasarse del máximo se expulsan entradas hasta quedar en esta fracción (no una a una)
+EVICTION_TARGET = 0.9
+
+
+class CacheStats:
+    """Contadores de la caché (compartidos por todos los hilos del proceso)."""
+
+    FIELDS = ('hits', 'misses', 'revalidations', 'changed', 'bytes_saved', 'bytes_downloaded', 'evictions')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for field, value in counts.items():
+                setattr(self, field, getattr(self, field) + value)
+
+    def to_dict(self):
+        with self._lock:
+            return {field: getattr(self, field) for field in self.FIELDS}
+
+    def report(self):
+        stats = self.to_dict()
+        if not (stats['hits'] or stats['misses'] or stats['changed']):
+            return
+        print("\n--- Caché HTTP (ETag) ---")
+        print(f"  {stats['hits']} aciertos (304, cuerpo servido desde la caché), {stats['misses']} fallos, "
+              f"{stats['revalidations']} revalidaciones ({stats['changed']} con cambios)")
+        print(f"  {stats['bytes_saved'] / 1024:.0f} KB ahorrados, {stats['bytes_downloaded'] / 1024:.0f} KB descargados, "
+              f"{stats['evictions']} entradas expulsadas")
+
+
+class LruFileCache:
+    """Caché de httplib2 (get/set/delete) en un directorio, con tamaño máximo y expulsión LRU.
+
+    Cada entrada es un archivo con nombre derivado de la URL; la fecha de modificación se
+    actualiza en cada lectura y marca su uso más reciente. Es segura entre hilos, y entre
+    procesos las escrituras son atómicas (archivo temporal + os.replace).
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024, stats=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = stats or CacheStats()
+        self._lock = threading.Lock()
+        self._local = threading.local() # Última consulta del hilo, para CachingHttp
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + ".cache")
+
+    def _entries(self):
+        """(ruta, tamaño, último uso) de cada entrada en disco."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".cache"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue # Otro proceso la acaba de expulsar
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path) # Marca el uso para la expulsión LRU
+        except OSError:
+            value = None
+        self._local.cached_size = len(value.split(b"\r\n\r\n", 1)[-1]) if value else None
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._total_bytes += len(value) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key):
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._total_bytes -= size
+
+    def _evict(self):
+        """Expulsa las entradas usadas hace más tiempo hasta bajar a EVICTION_TARGET del máximo."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes * EVICTION_TARGET:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self._total_bytes = total
+        self.stats.add(evictions=evicted)
+
+    def begin_request(self):
+        self._local.cached_size = None
+
+    def last_cached_size(self):
+        """Tamaño del cuerpo guardado que encontró la última consulta de este hilo (None si no había)."""
+        return getattr(self._local, 'cached_size', None)
+
+
+class CachingHttp(httplib2.Http):
+    """httplib2.Http con la caché LRU, que anota en sus estadísticas el resultado de cada GET."""
+
+    def request(self, uri, method="GET", *args, **kwargs):
+        self.cache.begin_request()
+        response, content = super().request(uri, method, *args, **kwargs)
+        if method == "GET":
+            cached_size = self.cache.last_cached_size()
+            if cached_size is None:
+                self.cache.stats.add(misses=1, bytes_downloaded=len(content))
+            elif getattr(response, 'fromcache', False):
+                # 304: la API no reenvió el cuerpo (o la entrada aún estaba fresca)
+                self.cache.stats.add(revalidations=1, hits=1, bytes_saved=len(content))
+            else:
+                self.cache.stats.add(revalidations=1, changed=1, bytes_downloaded=len(content))
+        return response, content
+
+
+# Caché activa de este proceso (None = sin caché)
+_active_cache = None
+
+
+def enable_response_cache(directory=HTTP_CACHE_DIR, max_mb=HTTP_CACHE_MAX_MB):
+    """Activa la caché para los transportes HTTP que se creen a partir de ahora y la devuelve.
+
+    Hay que llamarla antes de construir el servicio (get_authenticated_service).
+    """
+    global _active_cache
+    _active_cache = LruFileCache(directory, int(max_mb * 1024 * 1024))
+    return _active_cache
+
+
+def get_response_cache():
+    return _active_cache
+
+
+def new_http():
+    """Transporte httplib2 base para la API: con la caché activa si la hay."""
+    http = build_http() # Mismo timeout y redirecciones que usa googleapiclient
+    if _active_cache is None:
+        return http
+    caching_http = CachingHttp(cache=_active_cache, timeout=http.timeout)
+    caching_http.redirect_codes = http.redirect_codes
+    return caching_http
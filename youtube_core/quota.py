@@ -0,0 +1,177 @@
+"""Contabilidad de la cuota diaria de la YouTube Data API, compartida por todos los scripts.
+
+Cada llamada que pasa por execute_with_retry() se cobra una vez (si la API la cobra) con su
+coste documentado en un contador diario persistente (QUOTA_LEDGER_FILE). Como todos los scripts usan el mismo
+archivo, cada uno ve lo que han gastado los demás ese día. La cuota de la API se reinicia
+a medianoche, hora del Pacífico, así que el "día" del contador usa esa zona horaria.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError: # Python < 3.9
+    ZoneInfo = None
+
+try:
+    import fcntl # Bloqueo entre procesos (solo POSIX)
+except ImportError:
+    fcntl = None
+
+QUOTA_LEDGER_FILE = "quota_ledger.json"
+# Cuota diaria por defecto de un proyecto de Google Cloud para la YouTube Data API
+DAILY_QUOTA_BUDGET = 10000
+
+# Coste documentado (en unidades) de cada método usado por los scripts
+QUOTA_COSTS = {
+    "youtube.channels.list": 1,
+    "youtube.playlistItems.list": 1,
+    "youtube.videos.list": 1,
+    "youtube.videos.update": 50,
+}
+DEFAULT_COST = 1
+
+
+def _pacific_tz():
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo("America/Los_Angeles")
+        except ZoneInfoNotFoundError:
+            pass
+    return timezone(timedelta(hours=-8)) # Aproximación sin horario de verano
+
+
+def quota_cost(method_id, count=1):
+    """Coste en unidades de 'count' llamadas al método 'method_id' (p. ej. 'youtube.videos.list')."""
+    return QUOTA_COSTS.get(method_id, DEFAULT_COST) * count
+
+
+class QuotaLedger:
+    """Contador persistente de unidades de cuota gastadas por día."""
+
+    def __init__(self, filename=QUOTA_LEDGER_FILE, daily_budget=DAILY_QUOTA_BUDGET, clock=time.time):
+        self.filename = filename
+        self.daily_budget = daily_budget
+        self._clock = clock
+        self._tz = _pacific_tz()
+        self._lock = threading.Lock()
+
+    def today(self):
+        return datetime.fromtimestamp(self._clock(), self._tz).date().isoformat()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.filename + ".lock", 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, data):
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_path = tempfile.mkstemp(prefix=".quota-", dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+            json.dump(data, tmp, indent=2)
+        os.replace(tmp_path, self.filename)
+
+    def seconds_until_reset(self):
+        """Segundos hasta la medianoche del Pacífico, cuando la API reinicia la cuota."""
+        now = datetime.fromtimestamp(self._clock(), self._tz)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), now.tzinfo)
+        return max(0.0, midnight.timestamp() - now.timestamp())
+
+    def spent_today(self):
+        return self._read().get(self.today(), {}).get("total", 0)
+
+    def remaining(self):
+        return max(0, self.daily_budget - self.spent_today())
+
+    def charge(self, method_id, count=1):
+        """Anota el coste de 'count' llamadas a 'method_id'. Devuelve las unidades cobradas."""
+        units = quota_cost(method_id, count)
+        with self._locked():
+            data = self._read()
+            day = data.setdefault(self.today(), {"total": 0, "methods": {}})
+            day["total"] += units
+            day["methods"][method_id] = day["methods"].get(method_id, 0) + units
+            # Solo se conservan los últimos días
+            for old_day in sorted(data)[:-7]:
+                del data[old_day]
+            self._write(data)
+        return units
+
+    def charge_share(self, share, units):
+        """Anota que 'units' unidades ya cobradas hoy corresponden a 'share' (p. ej. 'watch').
+
+        No cambia el total: sirve para que un proceso reparta su propio presupuesto diario
+        aunque se reinicie, leyéndolo después con share_spent_today().
+        """
+        if units <= 0:
+            return
+        with self._locked():
+            data = self._read()
+            day = data.setdefault(self.today(), {"total": 0, "methods": {}})
+            shares = day.setdefault("shares", {})
+            shares[share] = shares.get(share, 0) + units
+            self._write(data)
+
+    def share_spent_today(self, share):
+        return self._read().get(self.today(), {}).get("shares", {}).get(share, 0)
+
+    def affordable(self, unit_cost, count):
+        """Cuántas de 'count' operaciones de 'unit_cost' unidades caben en lo que queda hoy."""
+        if unit_cost <= 0:
+            return count
+        return min(count, self.remaining() // unit_cost)
+
+    def report(self, estimated_units=None):
+        spent = self.spent_today()
+        print(f"Cuota de hoy ({self.today()}, hora del Pacífico): {spent} de {self.daily_budget} unidades gastadas.")
+        if estimated_units is not None:
+            print(f"Coste estimado de esta ejecución: {estimated_units} unidades "
+                  f"(quedan {max(0, self.daily_budget - spent)}).")
+
+
+# Contador activo del proceso (None = no se contabiliza)
+_active_ledger = None
+
+
+def enable_quota_ledger(filename=QUOTA_LEDGER_FILE, daily_budget=DAILY_QUOTA_BUDGET):
+    """Activa la contabilidad de cuota para todas las llamadas de este proceso y devuelve el contador."""
+    global _active_ledger
+    _active_ledger = QuotaLedger(filename, daily_budget)
+    return _active_ledger
+
+
+def get_quota_ledger():
+    return _active_ledger
+
+
+def charge_request(request, count=1):
+    """Cobra al contador activo (si lo hay) el coste de una petición de googleapiclient.
+
+    Devuelve las unidades que cuesta (aunque no haya contador activo).
+    """
+    method_id = getattr(request, "methodId", None)
+    if not method_id:
+        return 0
+    if _active_ledger is not None:
+        return _active_ledger.charge(method_id, count)
+    return quota_cost(method_id, count)
@@ -0,0 +1,128 @@
+"""Reintentos con espera exponencial (y jitter) para las llamadas a la YouTube Data API.
+
+Todas las llamadas de los scripts pasan por execute_with_retry(): los errores transitorios
+(429, 5xx, rateLimitExceeded...) se reintentan sobre la MISMA petición, así que una
+paginación reanuda con el mismo pageToken sin perder ni repetir páginas. Si se agota la
+cuota diaria se lanza QuotaExceededError para que el script se detenga de forma limpia.
+Cada llamada se cobra una sola vez en el contador de cuota, al terminar, con la misma regla
+que la API (is_charged); en una petición por lotes, cada sub-petición según su respuesta.
+"""
+import json
+import random
+import time
+
+from googleapiclient.errors import HttpError
+
+from youtube_core.quota import charge_request
+from youtube_core.tracing import record_call
+
+# Número máximo de reintentos por llamada y límites de la espera (en segundos)
+MAX_RETRIES = 5
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+
+# Motivos de error de la API que indican que la cuota diaria se ha agotado: reintentar no sirve
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+# Motivos de error que sí son transitorios aunque lleguen con código 403
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError", "internalError"}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class QuotaExceededError(Exception):
+    """La cuota diaria de la API se ha agotado; la ejecución debe detenerse."""
+
+    def __init__(self, message, http_error=None):
+        super().__init__(message)
+        self.http_error = http_error
+
+
+def get_error_reason(error):
+    """Devuelve el 'reason' del primer error de un HttpError de la API (o None)."""
+    content = error.content.decode('utf-8', 'replace') if isinstance(error.content, bytes) else str(error.content)
+    try:
+        errors = json.loads(content).get("error", {}).get("errors", [])
+    except (ValueError, AttributeError):
+        return None
+    return errors[0].get("reason") if errors else None
+
+
+def is_quota_error(error):
+    return isinstance(error, HttpError) and get_error_reason(error) in QUOTA_REASONS
+
+
+def is_retryable(error):
+    """Indica si un error merece reintentarse (errores de red, 429, 5xx o límites de tasa)."""
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUS or get_error_reason(error) in RETRYABLE_REASONS
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def is_charged(error):
+    """Indica si la API cobra una llamada que terminó con 'error' (None = con éxito).
+
+    Se cobran las llamadas con éxito y las rechazadas con un 4xx definitivo (400, 404...),
+    pero no los errores de red, los 5xx, los límites de tasa ni los rechazos por cuota agotada.
+    """
+    if error is None:
+        return True
+    return (isinstance(error, HttpError) and 400 <= error.resp.status < 500
+            and not is_quota_error(error) and not is_retryable(error))
+
+
+def charge_call(request, error=None):
+    """Cobra en el contador activo una llamada terminada. Devuelve las unidades que cobra la API.
+
+    En un BatchHttpRequest se cobra cada sub-petición según su propia respuesta.
+    """
+    sub_requests = getattr(request, "_requests", None)
+    if sub_requests is None:
+        return charge_request(request) if is_charged(error) else 0
+    charged = {} # methodId -> (una sub-petición, cuántas se cobran)
+    for request_id, (resp, content) in getattr(request, "_responses", {}).items():
+        sub_request = sub_requests.get(request_id)
+        method_id = getattr(sub_request, "methodId", None)
+        if method_id and is_charged(HttpError(resp, content) if resp.status >= 300 else None):
+            charged[method_id] = (sub_request, charged.get(method_id, (None, 0))[1] + 1)
+    return sum(charge_request(sub_request, count) for sub_request, count in charged.values())
+
+
+def backoff_delay(attempt, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+    """Espera exponencial con 'full jitter' para el reintento número 'attempt' (desde 0)."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def execute_with_retry(request, http=None, max_retries=MAX_RETRIES, sleep=time.sleep):
+    """Ejecuta 'request' (HttpRequest o BatchHttpRequest) reintentando los errores transitorios.
+
+    Lanza QuotaExceededError si la cuota diaria se ha agotado, y el último error si se
+    agotan los reintentos o el error no es transitorio. Al terminar, la llamada se cobra una
+    sola vez en el contador de cuota activo (charge_call: los reintentos de errores
+    transitorios no se cobran) y se anota en la traza activa (si la hay).
+    """
+    attempt = 0
+    call_start = time.perf_counter()
+    while True:
+        attempt_start = time.perf_counter()
+        try:
+            response = request.execute(http=http)
+        except Exception as e:
+            if is_quota_error(e):
+                units = charge_call(request, e)
+                record_call(request, time.perf_counter() - attempt_start, time.perf_counter() - call_start, attempt, e,
+                            quota_units=units)
+                raise QuotaExceededError("Cuota diaria de la API agotada.", e) from e
+            if attempt >= max_retries or not is_retryable(e):
+                units = charge_call(request, e)
+                record_call(request, time.perf_counter() - attempt_start, time.perf_counter() - call_start, attempt, e,
+                            quota_units=units)
+                raise
+            delay = backoff_delay(attempt)
+            status = e.resp.status if isinstance(e, HttpError) else type(e).__name__
+            print(f"  -> Error transitorio ({status}). Reintento {attempt + 1}/{max_retries} en {delay:.1f} s...")
+            sleep(delay)
+            attempt += 1
+            continue
+        units = charge_call(request)
+        now = time.perf_counter()
+        record_call(request, now - attempt_start, now - call_start, attempt, response=response, quota_units=units)
+        return response
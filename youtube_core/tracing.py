@@ -0,0 +1,203 @@
+"""Traza por llamada a la API: una línea JSON por cada execute() y un resumen de latencias.
+
+execute_with_retry() avisa aquí al terminar cada llamada (con éxito o no). Si hay una traza
+activa (enable_tracing) se guarda el endpoint, las 'part', cuántos IDs se pidieron, la
+latencia, el estado HTTP, los reintentos y la cuota cobrada; al final report() imprime los
+percentiles p50/p95/p99 por endpoint y puede añadir el resumen de la ejecución a un JSONL.
+Si está instalado 'opentelemetry-api', cada llamada se emite además como un span (no hace
+nada hasta que se configure un SDK/exportador).
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from googleapiclient.errors import HttpError
+
+from youtube_core.quota import quota_cost
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError: # opentelemetry es opcional
+    otel_trace = None
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """Percentil 'p' (rango más cercano) de una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def describe_request(request):
+    """(endpoint, parts, número de IDs, unidades de cuota por intento) de una petición de googleapiclient."""
+    sub_requests = getattr(request, "_requests", None)
+    if sub_requests is not None: # BatchHttpRequest: una petición HTTP con varias llamadas dentro
+        method_ids = [getattr(sub, "methodId", None) for sub in sub_requests.values()]
+        methods = sorted({method_id for method_id in method_ids if method_id})
+        units = sum(quota_cost(method_id) for method_id in method_ids if method_id)
+        return f"batch({','.join(methods)})", "", len(method_ids), units
+    method_id = getattr(request, "methodId", None) or "desconocido"
+    query = parse_qs(urlsplit(getattr(request, "uri", "")).query)
+    parts = query.get("part", [""])[-1]
+    ids = query.get("id", [""])[-1]
+    return method_id, parts, len(ids.split(",")) if ids else 0, quota_cost(method_id)
+
+
+class RunTrace:
+    """Guarda las llamadas de una ejecución (en memoria y, opcionalmente, en un archivo JSONL)."""
+
+    def __init__(self, filename=None, otel=True):
+        self.filename = filename
+        self.started_at = time.time()
+        self.endpoints = {}
+        self._lock = threading.Lock() # Se registran llamadas desde varios hilos
+        # Búfer de línea en modo 'a': cada registro es una sola escritura, así que varios
+        # procesos (modo multicanal) pueden compartir el archivo sin mezclar líneas
+        self._file = open(filename, 'a', encoding='utf-8', buffering=1) if filename else None
+        self._otel_tracer = otel_trace.get_tracer("youtube_core") if otel and otel_trace else None
+
+    def record(self, request, latency, elapsed, retries, error=None, response=None, quota_units=None):
+        """Registra una llamada terminada: 'latency' es la del último intento, 'elapsed' incluye reintentos.
+
+        'quota_units' son las unidades cobradas (las calcula execute_with_retry); sin indicarlas
+        se usa el coste de la petición.
+        """
+        endpoint, parts, id_count, units = describe_request(request)
+        if error is None:
+            status = 200
+        elif isinstance(error, HttpError):
+            status = error.resp.status
+        else:
+            status = type(error).__name__
+        entry = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'endpoint': endpoint,
+            'parts': parts,
+            'ids': id_count,
+            'items': len(response.get('items', [])) if isinstance(response, dict) else None,
+            'latency_ms': round(latency * 1000, 2),
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'status': status,
+            'retries': retries,
+            'quota_units': units if quota_units is None else quota_units,
+            'pid': os.getpid(),
+            'thread': threading.current_thread().name,
+        }
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {'latencies_ms': [], 'items': 0, 'errors': 0, 'retries': 0, 'quota_units': 0})
+            stats['latencies_ms'].append(entry['latency_ms'])
+            stats['items'] += entry['items'] or 0
+            stats['errors'] += error is not None
+            stats['retries'] += retries
+            stats['quota_units'] += entry['quota_units']
+            if self._file:
+                self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if self._otel_tracer:
+            self._emit_span(entry, latency)
+
+    def _emit_span(self, entry, latency):
+        end_ns = time.time_ns()
+        span = self._otel_tracer.start_span(entry['endpoint'], start_time=end_ns - int(latency * 1e9), attributes={
+            'youtube.parts': entry['parts'],
+            'youtube.id_count': entry['ids'],
+            'youtube.retries': entry['retries'],
+            'youtube.quota_units': entry['quota_units'],
+            'http.status_code': entry['status'] if isinstance(entry['status'], int) else 0,
+        })
+        span.end(end_time=end_ns)
+
+    def snapshot(self):
+        """Resumen acumulado (serializable), para combinar trazas de otros procesos con merge()."""
+        with self._lock:
+            return {endpoint: dict(stats, latencies_ms=list(stats['latencies_ms']))
+                    for endpoint, stats in self.endpoints.items()}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for endpoint, other in snapshot.items():
+                stats = self.endpoints.setdefault(endpoint, {'latencies_ms': [], 'items': 0, 'errors': 0, 'retries': 0, 'quota_units': 0})
+                stats['latencies_ms'].extend(other['latencies_ms'])
+                stats['items'] += other['items']
+                stats['errors'] += other['errors']
+                stats['retries'] += other['retries']
+                stats['quota_units'] += other['quota_units']
+
+    def summary(self):
+        """Resumen de la ejecución (una línea del JSONL de report()): totales y percentiles por endpoint."""
+        endpoints = {}
+        for endpoint, stats in sorted(self.snapshot().items()):
+            latencies = sorted(stats['latencies_ms'])
+            endpoints[endpoint] = {
+                'calls': len(latencies),
+                'items': stats['items'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'quota_units': stats['quota_units'],
+                **{f'p{p}_ms': percentile(latencies, p) for p in PERCENTILES},
+            }
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'duration_s': round(time.time() - self.started_at, 3),
+            'quota_units': sum(stats['quota_units'] for stats in endpoints.values()),
+            'endpoints': endpoints,
+        }
+
+    def report(self, summary_file=None):
+        """Imprime llamadas, items, errores, reintentos, cuota y latencias p50/p95/p99 de cada endpoint.
+
+        Con 'summary_file' añade además el resumen de la ejecución (summary()) como una línea JSON.
+        """
+        summary = self.summary()
+        if not summary['endpoints']:
+            return
+        print("\n--- Traza de llamadas a la API ---")
+        for endpoint, stats in summary['endpoints'].items():
+            pcts = ", ".join(f"p{p} {stats[f'p{p}_ms']:.0f} ms" for p in PERCENTILES)
+            print(f"  {endpoint}: {stats['calls']} llamadas, {stats['items']} items, {stats['errors']} errores, "
+                  f"{stats['retries']} reintentos, {stats['quota_units']} unidades | {pcts}")
+        print(f"  Cuota total: {summary['quota_units']} unidades en {summary['duration_s']} s")
+        if self.filename:
+            print(f"  Detalle por llamada en '{self.filename}'.")
+        if summary_file:
+            try:
+                with open(summary_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+            except IOError as e:
+                print(f"Error al guardar el resumen de la ejecución en '{summary_file}': {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+# Traza activa de este proceso (None = sin instrumentación)
+_active_trace = None
+
+
+def enable_tracing(filename=None, otel=True):
+    """Activa la traza de todas las llamadas de este proceso y la devuelve."""
+    global _active_trace
+    if _active_trace is not None:
+        _active_trace.close()
+    _active_trace = RunTrace(filename, otel)
+    atexit.register(_active_trace.close)
+    return _active_trace
+
+
+def get_trace():
+    return _active_trace
+
+
+def record_call(request, latency, elapsed, retries, error=None, response=None, quota_units=None):
+    """Registra una llamada en la traza activa, si la hay (lo llama execute_with_retry)."""
+    if _active_trace is not None:
+        _active_trace.record(request, latency, elapsed, retries, error, response, quota_units)
@@ -0,0 +1,59 @@
+"""Registro compacto de un video, común a generar_csv_videos.py y actualizar_metadata_videos.py.
+
+En vez de guardar los items de la API (diccionarios anidados: snippet, resourceId...) o un
+diccionario por fila hasta escribir la salida, cada video es un objeto con __slots__ (sin
+__dict__ por instancia). Los campos se extraen una sola vez de la respuesta, los IDs y los
+valores cortos que se repiten ("N/A", "public", la categoría...) se internan para que todos
+los registros compartan el mismo objeto, y los recuentos se guardan como int.
+"""
+import sys
+
+# Los textos de hasta esta longitud se internan (los largos, como títulos, casi nunca se repiten)
+INTERN_MAX_LENGTH = 32
+
+
+def compact_value(value, is_count=False):
+    """Valor de una columna en su forma compacta: int si es un recuento numérico, texto corto internado."""
+    if is_count:
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            pass # "N/A", "Error"... se conservan como texto
+    if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+class VideoRecord:
+    """Un video: ID, fecha y título, más lo que use cada script.
+
+    'description' y 'category_id' los usa actualizar_metadata_videos.py; 'values' son las
+    columnas exportadas por generar_csv_videos.py, en el orden de sus EXPORT_COLUMNS.
+    """
+
+    __slots__ = ('video_id', 'published_at', 'title', 'description', 'category_id', 'values')
+
+    def __init__(self, video_id, published_at=None, title=None, description=None, category_id=None, values=None):
+        self.video_id = sys.intern(video_id) if video_id else video_id
+        self.published_at = published_at
+        self.title = title
+        self.description = description
+        self.category_id = compact_value(category_id)
+        self.values = values
+
+    @classmethod
+    def from_playlist_item(cls, item):
+        """Registro de un item de playlistItems().list (snippet con publishedAt, title y resourceId)."""
+        snippet = item.get("snippet", {})
+        return cls(snippet.get("resourceId", {}).get("videoId"), snippet.get("publishedAt"),
+                   snippet.get("title", "Sin Título"))
+
+    @classmethod
+    def from_video_item(cls, item):
+        """Registro de un item de videos().list con part=snippet (título, descripción y categoría)."""
+        snippet = item.get("snippet", {})
+        return cls(item.get("id"), snippet.get("publishedAt"), snippet.get("title"),
+                   snippet.get("description", ""), snippet.get("categoryId"))
+
+    def __repr__(self):
+        return f"VideoRecord({self.video_id!r}, {self.published_at!r}, {self.title!r})"
@@ -0,0 +1,128 @@
+"""Tabla columnar de videos para el post-proceso de las exportaciones (necesita NumPy, opcional).
+
+En vez de recorrer las filas en Python para filtrar por fecha o buscar el máximo de likes,
+se guardan las columnas como arrays: fechas datetime64, recuentos int64 con una máscara
+de valores ausentes ("N/A", "Error"...), y los filtros, el top-N y los agregados por mes
+son operaciones vectorizadas. Los registros (VideoRecord) se conservan para los escritores.
+"""
+try:
+    import numpy as np
+except ImportError: # NumPy es opcional: sin él los scripts filtran fila a fila
+    np = None
+
+
+def parse_dates(values):
+    """Convierte fechas ISO de la API ("2025-03-01T10:00:00Z") a datetime64[s]; las inválidas pasan a NaT."""
+    cleaned = [value[:-1] if value and value.endswith("Z") else (value or "NaT") for value in values]
+    try:
+        return np.array(cleaned, dtype="datetime64[s]")
+    except ValueError:
+        # Alguna fecha con un formato inesperado: se convierten una a una para aislarla
+        dates = np.empty(len(cleaned), dtype="datetime64[s]")
+        for i, value in enumerate(cleaned):
+            try:
+                dates[i] = np.datetime64(value, "s")
+            except ValueError:
+                dates[i] = np.datetime64("NaT")
+        return dates
+
+
+class VideoTable:
+    """Columnas de un conjunto de videos: 'published' (datetime64), recuentos int64 con máscara y registros."""
+
+    def __init__(self, records, published, counts, valid):
+        self.records = records     # Registros VideoRecord, en el mismo orden que los arrays
+        self.published = published # datetime64[s]; NaT si la fecha no es válida
+        self.counts = counts       # {columna: array int64} (0 donde no hay número)
+        self.valid = valid         # {columna: array bool} True donde el recuento es un número
+
+    @classmethod
+    def from_records(cls, records, columns, int_columns):
+        """Crea la tabla a partir de registros cuyos 'values' siguen el orden de 'columns'.
+
+        Los recuentos ya vienen como int (ver compact_value); cualquier otro valor cuenta como ausente.
+        """
+        if np is None:
+            raise ImportError("VideoTable necesita NumPy (pip install numpy).")
+        counts = {}
+        valid = {}
+        for index, column in enumerate(columns):
+            if column not in int_columns:
+                continue
+            values = [record.values[index] for record in records]
+            valid[column] = np.fromiter((type(value) is int for value in values), dtype=bool, count=len(values))
+            counts[column] = np.fromiter((value if type(value) is int else 0 for value in values),
+                                         dtype=np.int64, count=len(values))
+        return cls(list(records), parse_dates([record.published_at for record in records]), counts, valid)
+
+    def __len__(self):
+        return len(self.records)
+
+    def take(self, selector):
+        """Nueva tabla con las filas indicadas (máscara booleana o array de posiciones)."""
+        indices = np.flatnonzero(selector) if getattr(selector, "dtype", None) == bool else np.asarray(selector)
+        return VideoTable(
+            [self.records[i] for i in indices],
+            self.published[indices],
+            {column: values[indices] for column, values in self.counts.items()},
+            {column: mask[indices] for column, mask in self.valid.items()},
+        )
+
+    def count_undated(self):
+        """Número de filas sin fecha de publicación válida."""
+        return int(np.isnat(self.published).sum())
+
+    def year_mask(self, year):
+        return self.published.astype("datetime64[Y]") == np.datetime64(f"{year:04d}", "Y")
+
+    def range_mask(self, start=None, end=None):
+        """Máscara de los videos publicados entre 'start' y 'end' (fechas 'AAAA-MM-DD', ambas incluidas)."""
+        mask = ~np.isnat(self.published)
+        days = self.published.astype("datetime64[D]")
+        if start:
+            mask &= days >= np.datetime64(start, "D")
+        if end:
+            mask &= days <= np.datetime64(end, "D")
+        return mask
+
+    def filter(self, year=None, start=None, end=None):
+        """Filtra por año y/o rango de fechas; las filas sin fecha válida quedan fuera."""
+        mask = self.range_mask(start, end)
+        if year is not None:
+            mask &= self.year_mask(year)
+        return self.take(mask)
+
+    def top_n(self, column, n):
+        """Posiciones de las 'n' filas con mayor valor de 'column' (solo las que tienen número), de mayor a menor.
+
+        Los empates se resuelven por posición (primero la fila anterior), también en el corte del n-ésimo.
+        """
+        candidates = np.flatnonzero(self.valid[column])
+        if n <= 0 or not len(candidates):
+            return np.array([], dtype=np.int64)
+        values = self.counts[column][candidates]
+        if len(candidates) > n:
+            # np.partition es O(n): da el n-ésimo mayor valor sin ordenar el resto
+            threshold = np.partition(values, len(values) - n)[len(values) - n]
+            above = values > threshold
+            tied = values == threshold
+            keep = above | (tied & (np.cumsum(tied) <= n - np.count_nonzero(above)))
+            candidates, values = candidates[keep], values[keep]
+        return candidates[np.lexsort((candidates, -values))]
+
+    def monthly_totals(self, column):
+        """Por mes de publicación: (meses 'AAAA-MM', videos, videos con número, suma de 'column')."""
+        dated = ~np.isnat(self.published)
+        months = self.published[dated].astype("datetime64[M]")
+        unique_months, inverse = np.unique(months, return_inverse=True)
+        videos = np.bincount(inverse, minlength=len(unique_months))
+        valid = self.valid[column][dated]
+        with_value = np.bincount(inverse, weights=valid, minlength=len(unique_months)).astype(np.int64)
+        totals = np.bincount(inverse, weights=self.counts[column][dated] * valid,
+                             minlength=len(unique_months)).astype(np.int64)
+        return unique_months.astype(str), videos, with_value, totals
+
+
+def numpy_available():
+    """Indica si NumPy está instalado (si no, los scripts usan el filtrado fila a fila)."""
+    return np is not None
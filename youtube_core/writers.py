@@ -0,0 +1,141 @@
+"""Escritores de salida de las exportaciones: CSV, JSONL comprimido y Parquet/Arrow tipados.
+
+Todos reciben las filas por lotes (listas de diccionarios) desde la misma tubería, así que
+una exportación puede escribir varios formatos a la vez sin volver a pedir nada a la API.
+Los formatos tipados guardan los recuentos como enteros (int64) y "N/A"/"Error" como null;
+el CSV conserva los valores tal cual. Parquet y Arrow necesitan 'pyarrow' (opcional).
+
+Un archivo '.arrow' (formato de archivo IPC) se puede leer sin parsear y mapeado en memoria:
+    pyarrow.ipc.open_file(pyarrow.memory_map("videos_youtube_2025.arrow")).read_all()
+"""
+import csv
+import gzip
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # pyarrow es opcional: solo hace falta para 'parquet' y 'arrow'
+    pa = None
+    pq = None
+
+# Extensión de archivo de cada formato de salida
+OUTPUT_EXTENSIONS = {
+    'csv': '.csv',
+    'jsonl.gz': '.jsonl.gz',
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+# Filas que se acumulan antes de escribir un grupo de filas en Parquet/Arrow
+ARROW_ROW_GROUP_SIZE = 10000
+
+
+def to_int_or_none(value):
+    """Convierte un recuento de la API ("123") a int; "N/A", "Error" o vacío pasan a None."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def typed_row(row, fieldnames, int_columns):
+    """Fila con las columnas enteras convertidas a int o None, en el orden de 'fieldnames'."""
+    return {
+        name: to_int_or_none(row.get(name)) if name in int_columns else row.get(name)
+        for name in fieldnames
+    }
+
+
+class CsvWriter:
+    """CSV de texto, igual que la salida de siempre. Vuelca a disco tras cada lote."""
+
+    def __init__(self, filename, fieldnames, int_columns=()):
+        self.filename = filename
+        self._file = open(filename, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+        self._writer.writeheader()
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlGzWriter:
+    """Un objeto JSON tipado por línea, comprimido con gzip a medida que se escribe."""
+
+    def __init__(self, filename, fieldnames, int_columns=()):
+        self.filename = filename
+        self.fieldnames = list(fieldnames)
+        self.int_columns = set(int_columns)
+        self._file = gzip.open(filename, 'wt', encoding='utf-8')
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(typed_row(row, self.fieldnames, self.int_columns), ensure_ascii=False))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ArrowWriter:
+    """Parquet o Arrow (archivo IPC) con esquema fijo: int64 para los recuentos y texto para el resto.
+
+    Los lotes de la API son de 50 filas; se acumulan hasta ARROW_ROW_GROUP_SIZE para no crear
+    miles de grupos de filas diminutos.
+    """
+
+    def __init__(self, filename, fieldnames, int_columns=(), file_format='parquet'):
+        if pa is None:
+            raise ImportError(f"El formato '{file_format}' necesita pyarrow (pip install pyarrow).")
+        self.filename = filename
+        self.fieldnames = list(fieldnames)
+        self.int_columns = set(int_columns)
+        self.schema = pa.schema([
+            (name, pa.int64() if name in self.int_columns else pa.string()) for name in self.fieldnames
+        ])
+        if file_format == 'parquet':
+            self._writer = pq.ParquetWriter(filename, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(filename, self.schema)
+        self._pending = []
+
+    def write_rows(self, rows):
+        self._pending.extend(typed_row(row, self.fieldnames, self.int_columns) for row in rows)
+        if len(self._pending) >= ARROW_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._writer.write_table(pa.Table.from_pylist(self._pending, schema=self.schema))
+            self._pending = []
+
+    def close(self):
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+
+
+def open_writer(file_format, filename, fieldnames, int_columns=()):
+    """Crea el escritor del formato pedido ('csv', 'jsonl.gz', 'parquet' o 'arrow')."""
+    if file_format == 'csv':
+        return CsvWriter(filename, fieldnames, int_columns)
+    if file_format == 'jsonl.gz':
+        return JsonlGzWriter(filename, fieldnames, int_columns)
+    if file_format in ('parquet', 'arrow'):
+        return ArrowWriter(filename, fieldnames, int_columns, file_format)
+    raise ValueError(f"Formato de salida desconocido: '{file_format}'. Opciones: {', '.join(OUTPUT_EXTENSIONS)}")
+
+
+def check_output_formats(formats):
+    """Comprueba antes de empezar que todos los formatos existen y tienen sus dependencias."""
+    for file_format in formats:
+        if file_format not in OUTPUT_EXTENSIONS:
+            raise ValueError(f"Formato de salida desconocido: '{file_format}'. Opciones: {', '.join(OUTPUT_EXTENSIONS)}")
+        if file_format in ('parquet', 'arrow') and pa is None:
+            raise ImportError(f"El formato '{file_format}' necesita pyarrow (pip install pyarrow).")